@@ -1,26 +1,67 @@
 from flask import Flask
-from dotenv import load_dotenv
+import logging
 import os
 
-# Load environment variables
-load_dotenv()
+# The application instance, built once per process by create_app()
+_APP = None
 
 def create_app():
+    """Return the application, building it on first call"""
+    global _APP
+    if _APP is None:
+        _APP = _build_app()
+    return _APP
+
+def _configure_logging():
+    """Send package log records through a queue so handlers write on a background thread"""
+    import atexit
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+    from flask.logging import default_handler
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, default_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    # Attached before app.logger is first touched, so Flask skips adding its own stream handler
+    logging.getLogger(__name__).addHandler(QueueHandler(log_queue))
+
+def _build_app():
+    # Load environment variables from .env (Vercel injects them directly, so skip the disk read there)
+    if not os.environ.get('VERCEL'):
+        from dotenv import load_dotenv
+        load_dotenv()
+    
+    from app.config import get_settings
+    settings = get_settings()
+    
+    _configure_logging()
     app = Flask(__name__)
     
     # Configuration
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-    app.config['SUPABASE_URL'] = os.getenv('SUPABASE_URL')
-    app.config['SUPABASE_KEY'] = os.getenv('SUPABASE_KEY')
-    app.config['SERPAPI_KEY'] = os.getenv('SERPAPI_KEY')
+    app.config['SECRET_KEY'] = settings.secret_key
+    app.config['SUPABASE_URL'] = settings.supabase_url
+    app.config['SUPABASE_KEY'] = settings.supabase_key
+    app.config['SERPAPI_KEY'] = settings.serpapi_key
+    app.config['SERPAPI_RPS'] = settings.serpapi_rps
 
     # Gmail SMTP configuration
-    app.config['GMAIL_SMTP_SERVER'] = os.getenv('GMAIL_SMTP_SERVER', 'smtp.gmail.com')
-    app.config['GMAIL_SMTP_PORT'] = int(os.getenv('GMAIL_SMTP_PORT', '587'))
-    # Prefer GMAIL_USER, fall back to GMAIL_USERNAME for backwards compatibility
-    app.config['GMAIL_USERNAME'] = os.getenv('GMAIL_USER') or os.getenv('GMAIL_USERNAME')
-    app.config['GMAIL_APP_PASSWORD'] = os.getenv('GMAIL_APP_PASSWORD')
-    app.config['GMAIL_FROM_EMAIL'] = os.getenv('GMAIL_FROM_EMAIL', app.config['GMAIL_USERNAME'])
+    app.config['GMAIL_SMTP_SERVER'] = settings.gmail_smtp_server
+    app.config['GMAIL_SMTP_PORT'] = settings.gmail_smtp_port
+    app.config['GMAIL_USERNAME'] = settings.gmail_username
+    app.config['GMAIL_APP_PASSWORD'] = settings.gmail_app_password
+    app.config['GMAIL_FROM_EMAIL'] = settings.gmail_from_email
+    
+    # Only warnings and errors are logged, so lower-level calls skip formatting entirely
+    app.logger.setLevel(logging.WARNING)
+    
+    # Build the shared Supabase client now so the first request in each worker doesn't pay for it
+    from app.database import get_supabase_client
+    with app.app_context():
+        try:
+            get_supabase_client()
+        except ValueError:
+            app.logger.warning("Supabase client not preloaded; check SUPABASE_URL and SUPABASE_KEY")
     
     # Register blueprints
     from app.auth import auth_bp
@@ -29,6 +70,13 @@ def create_app():
     app.register_blueprint(auth_bp)
     app.register_blueprint(dashboard_bp)
     
+    # Mark logged-in sessions permanent once, rather than re-flagging them every request
+    @app.before_request
+    def make_session_permanent():
+        from flask import session
+        if 'user_id' in session and not session.permanent:
+            session.permanent = True
+    
     # Make auth state available in all templates
     @app.context_processor
     def inject_auth_state():
@@ -46,4 +94,3 @@ def create_app():
         return render_template('index.html', logged_in='user_id' in session)
     
     return app
-
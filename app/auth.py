@@ -1,64 +1,104 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app
-from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
-from werkzeug.security import generate_password_hash, check_password_hash
+import secrets
+from functools import lru_cache, wraps
+from urllib.parse import quote
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app, jsonify
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from app.forms import SignupForm, LoginForm
-from app.database import create_user, get_user_by_email
+from app.database import (
+    create_user, get_user_by_email, invalidate_user, update_user_password_hash,
+    create_pending_signup, get_pending_signup, delete_pending_signup, delete_expired_pending_signups
+)
 from app.mail import send_email
 
 auth_bp = Blueprint('auth', __name__)
 
-def _get_serializer() -> URLSafeTimedSerializer:
-    """Create a URLSafeTimedSerializer for verification tokens."""
-    secret_key = current_app.config['SECRET_KEY']
-    return URLSafeTimedSerializer(secret_key)
+# How long a verification link stays valid
+VERIFICATION_MAX_AGE_SECONDS = 86400
 
+# Argon2id hasher using the OWASP recommended profile
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
 
-def _generate_verification_token(user: dict) -> str:
-    """Generate a signed token containing pending user data for email verification."""
-    serializer = _get_serializer()
-    return serializer.dumps(user, salt='email-verify')
 
+def _hash_password(password: str) -> str:
+    """Hash a password with Argon2id."""
+    return _password_hasher.hash(password)
 
-def _send_verification_email(user: dict) -> bool:
-    """Send verification email to user."""
-    token = _generate_verification_token(user)
-    verify_url = url_for('auth.verify', token=token, _external=True)
+
+def _verify_password(stored_hash: str, password: str) -> bool:
+    """
+    Verify a password against a stored hash.
+
+    Argon2 hashes are checked with argon2-cffi; legacy werkzeug hashes
+    (pbkdf2/scrypt) are still accepted so existing users can log in.
+    """
+    # Both argon2 and werkzeug hashes contain at least two '$' separators; skip
+    # the expensive hash work entirely for empty or malformed stored values
+    if not stored_hash or stored_hash.count('$') < 2:
+        return False
+    if not stored_hash.startswith('$argon2'):
+        return check_password_hash(stored_hash, password)
+    try:
+        return _password_hasher.verify(stored_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    """A throwaway hash used to keep login timing uniform for unknown emails."""
+    return _hash_password(secrets.token_urlsafe(16))
+
+
+def _password_needs_rehash(stored_hash: str) -> bool:
+    """Check whether a stored hash is legacy or uses outdated Argon2 parameters."""
+    if not stored_hash.startswith('$argon2'):
+        return True
+    return _password_hasher.check_needs_rehash(stored_hash)
+
+
+def _verify_base_url() -> str:
+    """
+    External URL of the verify endpoint without the token.
+
+    Cached per app when SERVER_NAME is configured; otherwise the host comes
+    from the current request, so it is resolved each time.
+    """
+    if not current_app.config.get('SERVER_NAME'):
+        return url_for('auth.verify', _external=True)
+    base_url = current_app.extensions.get('auth_verify_base_url')
+    if base_url is None:
+        base_url = url_for('auth.verify', _external=True)
+        current_app.extensions['auth_verify_base_url'] = base_url
+    return base_url
+
+
+def _send_verification_email(email: str, token: str) -> bool:
+    """Send verification email for a pending signup token."""
+    verify_url = f"{_verify_base_url()}?token={quote(token, safe='')}"
     subject = "Verify your FlightTrack email"
-    text = (
-        "Welcome to FlightTrack!\n\n"
-        f"Please verify your email by clicking the link below:\n{verify_url}\n\n"
-        "This link will expire in 24 hours."
-    )
-    html = (
-        f"<p>Welcome to FlightTrack!</p>"
-        f"<p>Please verify your email by clicking the link below:</p>"
-        f"<p><a href=\"{verify_url}\">{verify_url}</a></p>"
-        f"<p>This link will expire in 24 hours.</p>"
-    )
-    sent_ok = send_email(user['email'], subject, text, html)
+    # Templates are compiled once and cached by Flask's Jinja environment;
+    # the .html template is autoescaped
+    text = render_template('emails/verify.txt', verify_url=verify_url)
+    html = render_template('emails/verify.html', verify_url=verify_url)
+    sent_ok = send_email(email, subject, text, html)
     return sent_ok
 
 
-def _load_token(token: str, max_age_seconds: int = 86400):
-    """Validate a token and return payload or None on error."""
-    serializer = _get_serializer()
-    try:
-        return serializer.loads(token, max_age=max_age_seconds, salt='email-verify')
-    except SignatureExpired:
-        flash('Verification link has expired. Please request a new one.', 'warning')
-    except BadSignature:
-        flash('Invalid verification link.', 'danger')
-    return None
+_LOGIN_ENDPOINT = 'auth.login'
 
 
 def login_required(f):
     """Decorator to require login"""
-    from functools import wraps
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
+            # API/AJAX callers get a plain 401 instead of a flash + redirect
+            if request.accept_mimetypes.best == 'application/json':
+                return jsonify(error='auth'), 401
             flash('Please log in to access this page.', 'warning')
-            return redirect(url_for('auth.login'))
+            return redirect(url_for(_LOGIN_ENDPOINT))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -76,10 +116,11 @@ def signup():
             flash('An account with this email already exists. Please log in.', 'danger')
             return redirect(url_for('auth.login'))
         
-        # Hash password and send verification email with pending payload
-        password_hash = generate_password_hash(password)
-        pending_user = {'email': email, 'password_hash': password_hash}
-        sent = _send_verification_email(pending_user)
+        # Store the signup under a short random token and email only the token
+        delete_expired_pending_signups(VERIFICATION_MAX_AGE_SECONDS)
+        token = secrets.token_urlsafe(32)
+        pending = create_pending_signup(token, email, _hash_password(password))
+        sent = pending is not None and _send_verification_email(email, token)
         if sent:
             flash('Please check your email to verify your account.', 'success')
         else:
@@ -103,10 +144,19 @@ def login():
         # Get user from database
         user = get_user_by_email(email)
         
-        if user and check_password_hash(user['password_hash'], password):
+        if not user:
+            # Burn the same hashing cost as a real check so response time does
+            # not reveal whether the email is registered
+            _verify_password(_dummy_hash(), password)
+        
+        if user and _verify_password(user.get('password_hash') or '', password):
+            # Lazily migrate legacy or outdated hashes now that we have the plaintext
+            if _password_needs_rehash(user['password_hash']):
+                update_user_password_hash(user['id'], _hash_password(password))
+                invalidate_user(email)
+            
             # Log user in
-            session['user_id'] = user['id']
-            session['email'] = user['email']
+            session.update({'user_id': user['id'], 'email': user['email'], 'is_verified': True})
             flash('Logged in successfully!', 'success')
             return redirect(url_for('dashboard.index'))
         else:
@@ -128,23 +178,24 @@ def verify():
         flash('Missing verification token.', 'danger')
         return redirect(url_for('auth.login'))
     
-    payload = _load_token(token)
-    if not payload:
+    pending = get_pending_signup(token, VERIFICATION_MAX_AGE_SECONDS)
+    if not pending:
+        flash('Invalid or expired verification link. Please sign up again.', 'danger')
         return redirect(url_for('auth.login'))
 
     # If already verified, just log in
-    existing = get_user_by_email(payload.get('email'))
+    existing = get_user_by_email(pending['email'])
     if existing:
-        session['user_id'] = existing['id']
-        session['email'] = existing['email']
+        delete_pending_signup(token)
+        session.update({'user_id': existing['id'], 'email': existing['email'], 'is_verified': True})
         flash('Email already verified. You are now logged in.', 'info')
         return redirect(url_for('dashboard.index'))
 
     # Create verified user now
-    created = create_user(payload.get('email'), payload.get('password_hash'))
+    created = create_user(pending['email'], pending['password_hash'])
     if created:
-        session['user_id'] = created['id']
-        session['email'] = created['email']
+        delete_pending_signup(token)
+        session.update({'user_id': created['id'], 'email': created['email'], 'is_verified': True})
         flash('Email verified! You are now logged in.', 'success')
         return redirect(url_for('dashboard.index'))
 
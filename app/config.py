@@ -0,0 +1,69 @@
+"""
+Application settings read from the environment
+"""
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+# Environment variables the application reads
+_ENV_KEYS = (
+    'SECRET_KEY',
+    'SUPABASE_URL',
+    'SUPABASE_KEY',
+    'SERPAPI_KEY',
+    'SERPAPI_RPS',
+    'GMAIL_SMTP_SERVER',
+    'GMAIL_SMTP_PORT',
+    'GMAIL_USER',
+    'GMAIL_USERNAME',
+    'GMAIL_APP_PASSWORD',
+    'GMAIL_FROM_EMAIL',
+)
+
+
+# Used only when SECRET_KEY is not set at all (local development)
+_DEV_SECRET_KEY = 'dev-secret-key-change-in-production'
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Configuration values loaded once from environment variables"""
+    secret_key: str
+    supabase_url: Optional[str]
+    supabase_key: Optional[str]
+    serpapi_key: Optional[str]
+    serpapi_rps: float
+    gmail_smtp_server: str
+    gmail_smtp_port: int
+    gmail_username: Optional[str]
+    gmail_app_password: Optional[str]
+    gmail_from_email: Optional[str]
+
+
+def _snapshot_environment() -> Mapping[str, Optional[str]]:
+    """Read every application key from the environment in one pass"""
+    environ = os.environ
+    return MappingProxyType({key: environ.get(key) for key in _ENV_KEYS})
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings singleton (call after the .env file has been loaded)"""
+    env = _snapshot_environment()
+    # Prefer GMAIL_USER, fall back to GMAIL_USERNAME for backwards compatibility
+    gmail_username = env['GMAIL_USER'] or env['GMAIL_USERNAME']
+    return Settings(
+        # Only an unset key falls back; an empty SECRET_KEY must not silently become the public dev key
+        secret_key=_DEV_SECRET_KEY if env['SECRET_KEY'] is None else env['SECRET_KEY'],
+        supabase_url=env['SUPABASE_URL'],
+        supabase_key=env['SUPABASE_KEY'],
+        serpapi_key=env['SERPAPI_KEY'],
+        serpapi_rps=float(env['SERPAPI_RPS'] or '5'),
+        gmail_smtp_server=env['GMAIL_SMTP_SERVER'] or 'smtp.gmail.com',
+        gmail_smtp_port=int(env['GMAIL_SMTP_PORT'] or '587'),
+        gmail_username=gmail_username,
+        gmail_app_password=env['GMAIL_APP_PASSWORD'],
+        gmail_from_email=env['GMAIL_FROM_EMAIL'] or gmail_username,
+    )
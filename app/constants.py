@@ -17,6 +17,27 @@ DEFAULT_CURRENCY = 'USD'
 # API timeout in seconds
 API_TIMEOUT = 30
 
+# SerpAPI retries for rate limits (429) and transient 5xx: exponential backoff
+# with jitter, capped at SERPAPI_BACKOFF_MAX seconds (Retry-After wins when sent)
+SERPAPI_MAX_RETRIES = 5
+SERPAPI_BACKOFF_MAX = 32
+SERPAPI_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Web requests (inside an app context) search inline, so they get a much shorter budget
+SERPAPI_WEB_MAX_RETRIES = 1
+SERPAPI_WEB_BACKOFF_MAX = 2
+
+# Dashboard pagination
+DASHBOARD_PAGE_SIZE = 25
+DASHBOARD_MAX_PAGE_SIZE = 100
+
+# Columns the dashboard list actually renders (skips the bulky JSONB blobs)
+DASHBOARD_REQUEST_COLUMNS = 'id, depart_from, arrive_at, departure_date, return_date, trip_type, stops, preferred_airlines, created_at'
+DASHBOARD_TRACKING_COLUMNS = 'minimum_price, airlines, flight_link, last_checked'
+
+# Columns the scheduled flight check reads for each active search request
+CRON_REQUEST_COLUMNS = 'id, user_id, depart_from, arrive_at, departure_date, return_date, preferred_airlines, stops, serpapi_params'
+
 # Flash message categories
 FLASH_SUCCESS = 'success'
 FLASH_DANGER = 'danger'
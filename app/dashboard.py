@@ -1,32 +1,83 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+import hashlib
+import time
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, make_response, current_app
 from app.forms import SearchRequestForm
 from app.database import (
     create_search_request, get_user_search_requests_with_tracking, get_search_request_by_id,
+    get_dashboard_version,
     update_search_request, delete_search_request,
     update_price_tracking_with_result
 )
 from app.auth import login_required
-from app.serpapi_service import search_flights
 from app.utils import format_flash_errors, prepare_search_request_data, populate_form_from_search_request, get_cheapest_price_from_flight
-from app.constants import FLASH_SUCCESS, FLASH_DANGER, FLASH_WARNING
+from app.constants import (
+    FLASH_SUCCESS, FLASH_DANGER, FLASH_WARNING, DASHBOARD_PAGE_SIZE, DASHBOARD_MAX_PAGE_SIZE,
+    DASHBOARD_REQUEST_COLUMNS, DASHBOARD_TRACKING_COLUMNS
+)
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 
+def _dashboard_etag(user_id: str, page: int, size: int, version: dict) -> str:
+    """
+    Build an ETag for one dashboard page from get_dashboard_version().
+
+    The CSRF token and a time window shorter than the CSRF time limit are mixed
+    in so a cached page never carries a token that has already expired.
+    """
+    csrf_window = max(int(current_app.config.get('WTF_CSRF_TIME_LIMIT') or 3600) // 2, 1)
+    stamp = f"{version.get('request_count')}:{version.get('requests_changed_at')}:{version.get('tracking_checked_at')}"
+    key = f"{user_id}:{session.get('csrf_token')}:{int(time.time()) // csrf_window}:{page}:{size}:{stamp}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
 @dashboard_bp.route('/')
 @login_required
 def index():
     """Display dashboard with user's search requests and create form"""
     user_id = session['user_id']
     
-    # Get all search requests with tracking data (optimized single query)
-    requests = get_user_search_requests_with_tracking(user_id)
-    
-    # Create form for new requests
-    form = SearchRequestForm()
-    
-    return render_template('dashboard.html', 
-                         requests=requests, 
-                         form=form)
+    # Pagination (?page=1&size=25)
+    page = max(request.args.get('page', 1, type=int) or 1, 1)
+    size = min(max(request.args.get('size', DASHBOARD_PAGE_SIZE, type=int) or DASHBOARD_PAGE_SIZE, 1), DASHBOARD_MAX_PAGE_SIZE)
+    offset = (page - 1) * size
+    
+    # Check the client's cached copy against a cheap summary of the user's rows
+    # before loading the page. Pending flash messages must be shown, so never
+    # short-circuit then. Without a version the page is always served in full.
+    version = get_dashboard_version(user_id)
+    etag = _dashboard_etag(user_id, page, size, version) if version else None
+    if etag and '_flashes' not in session and request.if_none_match.contains(etag):
+        response = make_response('', 304)
+        has_next = (version.get('request_count') or 0) > offset + size
+    else:
+        # Get one page of search requests with tracking data (optimized single query).
+        # One extra row is fetched to know whether there is a next page.
+        # Tracking rows are attached in place, so the list is passed straight to the template.
+        requests = get_user_search_requests_with_tracking(
+            user_id, limit=size + 1, offset=offset,
+            columns=DASHBOARD_REQUEST_COLUMNS, tracking_columns=DASHBOARD_TRACKING_COLUMNS
+        )
+        has_next = len(requests) > size
+        if has_next:
+            requests = requests[:size]
+        
+        # Create form for new requests (SearchRequestForm is defined once at module scope)
+        form = SearchRequestForm()
+        
+        response = make_response(render_template('dashboard.html', 
+                                                 requests=requests, 
+                                                 form=form,
+                                                 page=page,
+                                                 size=size,
+                                                 offset=offset,
+                                                 has_next=has_next))
+    
+    if has_next:
+        next_url = url_for('dashboard.index', page=page + 1, size=size)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    if etag:
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
 
 @dashboard_bp.route('/create', methods=['POST'])
 @login_required
@@ -56,14 +107,9 @@ def create():
             
             # Automatically search flights after creating the request
             try:
-                search_result = search_flights(
-                    depart_from=search_request['depart_from'],
-                    arrive_at=search_request['arrive_at'],
-                    departure_date=search_request['departure_date'],
-                    return_date=search_request.get('return_date'),
-                    preferred_airlines=search_request.get('preferred_airlines'),
-                    stops=search_request.get('stops', 0)
-                )
+                from app.serpapi_service import search_saved_request
+                
+                search_result = search_saved_request(search_request)
                 
                 if search_result and search_result.get('success'):
                     cheapest_flight = search_result.get('cheapest_flight')
@@ -89,7 +135,7 @@ def create():
                     flash(f'Flight search failed: {error_msg}', FLASH_WARNING)
             
             except Exception as e:
-                print(f"Error searching flights after creation: {e}")
+                current_app.logger.exception("search_flights failed after creating request")
                 flash(f'Request created but search failed: {str(e)}', FLASH_WARNING)
         else:
             flash('An error occurred while creating the request.', FLASH_DANGER)
@@ -169,15 +215,10 @@ def search_flights_for_request(request_id):
         return redirect(url_for('dashboard.index'))
     
     try:
-        # Perform flight search using SerpAPI
-        search_result = search_flights(
-            depart_from=search_request['depart_from'],
-            arrive_at=search_request['arrive_at'],
-            departure_date=search_request['departure_date'],
-            return_date=search_request.get('return_date'),
-            preferred_airlines=search_request.get('preferred_airlines'),
-            stops=search_request.get('stops', 0)
-        )
+        from app.serpapi_service import search_saved_request
+        
+        # Perform flight search using SerpAPI (with the row's precomputed parameters)
+        search_result = search_saved_request(search_request)
         
         if search_result and search_result.get('success'):
             cheapest_flight = search_result.get('cheapest_flight')
@@ -203,7 +244,7 @@ def search_flights_for_request(request_id):
             flash(f'Flight search failed: {error_msg}', FLASH_DANGER)
     
     except Exception as e:
-        print(f"Error searching flights: {e}")
+        current_app.logger.exception("search_flights failed")
         flash(f'An error occurred while searching for flights: {str(e)}', 'danger')
     
     return redirect(url_for('dashboard.index'))
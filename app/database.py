@@ -1,31 +1,51 @@
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache, wraps
+import httpx
+from cachetools import TTLCache
 from supabase import create_client, Client
-from flask import current_app
-from typing import Optional, Dict, List
+from supabase.lib.client_options import SyncClientOptions
+from flask import current_app, has_app_context
+from app.config import get_settings
+from typing import Optional, Dict, Iterable, Iterator, List
 
-# Module-level cache for Supabase client (per application context)
-_supabase_client = None
+logger = logging.getLogger(__name__)
 
-def get_supabase_client() -> Client:
-    """Get Supabase client instance (cached per application context)"""
-    global _supabase_client
-    
-    # Return cached client if available
-    if _supabase_client is not None:
-        return _supabase_client
-    
-    url = current_app.config.get('SUPABASE_URL')
-    key = current_app.config.get('SUPABASE_KEY')
-    
-    if not url or not key:
-        raise ValueError("Supabase URL and Key must be set in environment variables")
-    
-    # Strip any whitespace from the key and URL
-    url = url.strip()
-    key = key.strip()
-    
+# Short-lived cache of user rows by email to absorb repeated login/signup lookups.
+# Set DISABLE_USER_CACHE=1 to turn it off (e.g. in tests).
+_USER_CACHE_ENABLED = os.getenv('DISABLE_USER_CACHE', '').lower().strip() not in ('1', 'true', 'yes')
+_user_cache = TTLCache(maxsize=1024, ttl=30)
+_user_cache_lock = threading.Lock()
+_MISSING = object()
+
+# Price tracking rows by search request id, kept briefly to match the polling cadence
+_tracking_cache = TTLCache(maxsize=1024, ttl=15)
+_tracking_cache_lock = threading.Lock()
+
+# Pooled HTTP clients backing the cached Supabase clients (closed at exit)
+_http_clients: List[httpx.Client] = []
+
+@lru_cache(maxsize=4)
+def _make_client(url: str, key: str) -> Client:
+    """Create a Supabase client (cached per process for each url/key pair)"""
     try:
-        _supabase_client = create_client(url, key)
-        return _supabase_client
+        # Explicit pool limits so concurrent workers reuse keep-alive connections;
+        # HTTP/2 multiplexes PostgREST calls to the same host over one connection
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30),
+            timeout=httpx.Timeout(10.0, connect=2.0),
+            http2=True,
+            follow_redirects=True,
+        )
+        client = create_client(url, key, options=SyncClientOptions(httpx_client=http_client))
+        _http_clients.append(http_client)
+        return client
     except Exception as e:
         # Provide more detailed error information
         error_type = type(e).__name__
@@ -36,33 +56,131 @@ def get_supabase_client() -> Client:
             f"Please verify your SUPABASE_URL and SUPABASE_KEY in .env file."
         ) from e
 
+def get_supabase_client() -> Client:
+    """
+    Get Supabase client instance (shared across requests in this process).
+
+    Outside an app context (e.g. scheduled scripts) the credentials come straight
+    from the environment settings, so the same pooled client is used without Flask.
+    """
+    if has_app_context():
+        url = current_app.config.get('SUPABASE_URL')
+        key = current_app.config.get('SUPABASE_KEY')
+    else:
+        settings = get_settings()
+        url = settings.supabase_url
+        key = settings.supabase_key
+    
+    if not url or not key:
+        raise ValueError("Supabase URL and Key must be set in environment variables")
+    
+    # Strip any whitespace from the key and URL
+    return _make_client(url.strip(), key.strip())
+
+def close_clients() -> None:
+    """Close pooled connections and drop all cached Supabase clients"""
+    _make_client.cache_clear()
+    while _http_clients:
+        _http_clients.pop().close()
+
+atexit.register(close_clients)
+
+# Connection-level failures where the request never reached PostgREST, so retrying is safe even for writes
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.PoolTimeout)
+
+# Retries taken per wrapped function, for observability
+retry_counts = Counter()
+_retry_counts_lock = threading.Lock()
+
+def retry_db(max_attempts: int = 2):
+    """Retry a database call on transient connection errors, with jittered exponential backoff"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_attempts):
+                try:
+                    return fn(*args, **kwargs)
+                except _RETRYABLE_ERRORS as e:
+                    if attempt == max_attempts - 1:
+                        raise
+                    with _retry_counts_lock:
+                        retry_counts[fn.__name__] += 1
+                    logger.warning("Retrying %s after %s", fn.__name__, type(e).__name__)
+                    time.sleep(random.uniform(0.02, 0.05 * (2 ** attempt)))
+        return wrapper
+    return decorator
+
+@retry_db()
+def _execute(query):
+    """Execute a PostgREST query or RPC call"""
+    return query.execute()
+
+# IDs per IN (...) filter; keeps the PostgREST query string well under URL length limits
+_IN_CHUNK_SIZE = 200
+
+# Rows per page when reading every active search request
+_ACTIVE_PAGE_SIZE = 1000
+
+# Rows per bulk write RPC, keeping request bodies a reasonable size on big runs
+_WRITE_CHUNK_SIZE = 500
+
+def _chunks(values: List, size: int = _IN_CHUNK_SIZE) -> Iterator[List]:
+    """Split values into lists of at most size items"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _fetch_one(query) -> Optional[Dict]:
+    """Run a point-lookup query, asking PostgREST for at most one row as an object"""
+    result = _execute(query.limit(1).maybe_single())
+    # maybe_single() returns no response at all when nothing matched
+    return result.data if result else None
+
 def create_user(email: str, password_hash: str) -> Optional[Dict]:
     """Create a new user in the database"""
     supabase = get_supabase_client()
     try:
-        result = supabase.table('users').insert({
+        result = _execute(supabase.table('users').insert({
             'email': email,
             'password_hash': password_hash
-        }).execute()
+        }))
         
         if result.data:
             return result.data[0]
         return None
-    except Exception as e:
-        print(f"Error creating user: {e}")
+    except Exception:
+        logger.exception("Error creating user")
         return None
+    finally:
+        # Drop any cached row for this email, whether or not the insert went through
+        invalidate_user(email)
+
+def invalidate_user(email: str) -> None:
+    """Drop a cached user row so the next lookup hits the database"""
+    with _user_cache_lock:
+        _user_cache.pop(email, None)
 
 def get_user_by_email(email: str) -> Optional[Dict]:
-    """Get user by email"""
+    """
+    Get user by email (found users are cached for a few seconds).
+
+    Misses are not cached: the user may be created moments later by another
+    worker (e.g. email verification), and duplicate-email checks must see it.
+    """
+    if _USER_CACHE_ENABLED:
+        with _user_cache_lock:
+            cached = _user_cache.get(email)
+        if cached is not None:
+            return cached
+    
     supabase = get_supabase_client()
     try:
-        result = supabase.table('users').select('*').eq('email', email).execute()
-        
-        if result.data and len(result.data) > 0:
-            return result.data[0]
-        return None
-    except Exception as e:
-        print(f"Error getting user: {e}")
+        user = _fetch_one(supabase.table('users').select('*').eq('email', email))
+        if user is not None and _USER_CACHE_ENABLED:
+            with _user_cache_lock:
+                _user_cache[email] = user
+        return user
+    except Exception:
+        logger.exception("Error getting user")
         return None
 
 
@@ -70,21 +188,111 @@ def get_user_by_id(user_id: str) -> Optional[Dict]:
     """Get user by ID"""
     supabase = get_supabase_client()
     try:
-        result = supabase.table('users').select('*').eq('id', user_id).execute()
+        return _fetch_one(supabase.table('users').select('*').eq('id', user_id))
+    except Exception:
+        logger.exception("Error getting user by id")
+        return None
 
-        if result.data and len(result.data) > 0:
+def get_users_by_ids(user_ids: Iterable[str], columns: str = 'id, email') -> List[Dict]:
+    """Get several users in as few queries as possible (used by batch jobs)"""
+    supabase = get_supabase_client()
+    try:
+        users = []
+        for chunk in _chunks(list(user_ids)):
+            result = _execute(supabase.table('users').select(columns).in_('id', chunk))
+            users.extend(result.data or [])
+        return users
+    except Exception:
+        logger.exception("Error getting users by id")
+        return []
+
+def update_user_password_hash(user_id: str, password_hash: str) -> Optional[Dict]:
+    """Replace a user's stored password hash"""
+    supabase = get_supabase_client()
+    try:
+        result = _execute(supabase.table('users').update({'password_hash': password_hash}).eq('id', user_id))
+
+        if result.data:
             return result.data[0]
         return None
-    except Exception as e:
-        print(f"Error getting user by id: {e}")
+    except Exception:
+        logger.exception("Error updating password hash")
         return None
 
+def create_pending_signup(token: str, email: str, password_hash: str) -> Optional[Dict]:
+    """Store a signup awaiting email verification under its token"""
+    supabase = get_supabase_client()
+    try:
+        result = _execute(supabase.table('pending_signups').insert({
+            'token': token,
+            'email': email,
+            'password_hash': password_hash
+        }))
+
+        if result.data:
+            return result.data[0]
+        return None
+    except Exception:
+        logger.exception("Error creating pending signup")
+        return None
+
+def get_pending_signup(token: str, max_age_seconds: int) -> Optional[Dict]:
+    """Get a pending signup by token, ignoring ones older than max_age_seconds"""
+    supabase = get_supabase_client()
+    try:
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)).isoformat()
+        return _fetch_one(supabase.table('pending_signups').select('*').eq('token', token).gte('created_at', cutoff))
+    except Exception:
+        logger.exception("Error getting pending signup")
+        return None
+
+def delete_pending_signup(token: str) -> bool:
+    """Delete a pending signup once it has been verified"""
+    supabase = get_supabase_client()
+    try:
+        _execute(supabase.table('pending_signups').delete().eq('token', token))
+        return True
+    except Exception:
+        logger.exception("Error deleting pending signup")
+        return False
+
+def delete_expired_pending_signups(max_age_seconds: int) -> bool:
+    """Delete pending signups older than max_age_seconds"""
+    supabase = get_supabase_client()
+    try:
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)).isoformat()
+        _execute(supabase.table('pending_signups').delete().lt('created_at', cutoff))
+        return True
+    except Exception:
+        logger.exception("Error deleting expired pending signups")
+        return False
+
+# Search request fields that determine the SerpAPI query
+_SEARCH_FIELDS = ('depart_from', 'arrive_at', 'departure_date', 'return_date', 'preferred_airlines', 'stops')
+
+def _build_serpapi_params(fields: Dict) -> Dict:
+    """Precompute the SerpAPI query parameters for a search request"""
+    from app.serpapi_service import build_search_params
+    
+    return build_search_params(
+        depart_from=fields['depart_from'],
+        arrive_at=fields['arrive_at'],
+        departure_date=fields['departure_date'],
+        return_date=fields.get('return_date'),
+        preferred_airlines=fields.get('preferred_airlines'),
+        stops=fields.get('stops', 0)
+    )
+
 def create_search_request(user_id: str, depart_from: str, arrive_at: str, 
                          departure_date: str, return_date: Optional[str],
                          trip_type: str, 
                          preferred_airlines: Optional[List[str]],
                          stops: int = 0) -> Optional[Dict]:
-    """Create a new search request"""
+    """
+    Create a new search request together with its price tracking row.
+    Both inserts run in the create_search_request_with_tracking Postgres
+    function, so this is one atomic round-trip.
+    """
     supabase = get_supabase_client()
     try:
         data = {
@@ -97,201 +305,245 @@ def create_search_request(user_id: str, depart_from: str, arrive_at: str,
             'preferred_airlines': preferred_airlines,
             'stops': stops
         }
+        data['serpapi_params'] = _build_serpapi_params(data)
         
-        result = supabase.table('search_requests').insert(data).execute()
+        result = _execute(supabase.rpc(
+            'create_search_request_with_tracking',
+            {f'p_{field}': value for field, value in data.items()}
+        ))
         
         if result.data:
-            search_request = result.data[0]
-            # Initialize price tracking entry
-            create_price_tracking(search_request['id'])
-            return search_request
+            return result.data[0]
         return None
-    except Exception as e:
-        print(f"Error creating search request: {e}")
+    except Exception:
+        logger.exception("Error creating search request")
         return None
 
-def get_user_search_requests(user_id: str) -> List[Dict]:
-    """Get all search requests for a user"""
+def get_user_search_requests(user_id: str, limit: Optional[int] = None, offset: int = 0,
+                             columns: str = '*') -> List[Dict]:
+    """Get search requests for a user, newest first (optionally one page of them)"""
     supabase = get_supabase_client()
     try:
-        result = supabase.table('search_requests').select('*').eq('user_id', user_id).order('created_at', desc=True).execute()
+        query = supabase.table('search_requests').select(columns).eq('user_id', user_id).order('created_at', desc=True)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        result = _execute(query)
         return result.data if result.data else []
-    except Exception as e:
-        print(f"Error getting search requests: {e}")
+    except Exception:
+        logger.exception("Error getting search requests")
         return []
 
-def get_user_search_requests_with_tracking(user_id: str) -> List[Dict]:
+def get_user_search_requests_with_tracking(user_id: str, limit: Optional[int] = None,
+                                           offset: int = 0, columns: str = '*',
+                                           tracking_columns: str = '*') -> List[Dict]:
     """
-    Get all search requests for a user with price tracking data
-    Optimized to reduce database queries
+    Get search requests for a user with price tracking data
+    Uses a single PostgREST query that embeds each request's price_tracking
+    row, so the whole dashboard list comes back in one round-trip
     
     Args:
         user_id: User ID
+        limit: Maximum number of requests to return (all if None)
+        offset: Number of requests to skip (newest first)
+        columns: search_requests columns to select
+        tracking_columns: price_tracking columns to embed
     
     Returns:
         List of search requests with price_tracking attached (which includes latest search result data)
     """
     supabase = get_supabase_client()
     try:
-        # Get all search requests
-        requests_result = supabase.table('search_requests').select('*').eq('user_id', user_id).order('created_at', desc=True).execute()
-        requests = requests_result.data if requests_result.data else []
+        query = supabase.table('search_requests').select(f'{columns}, price_tracking({tracking_columns})').eq('user_id', user_id).order('created_at', desc=True)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        result = _execute(query)
+        requests = result.data if result.data else []
         
-        if not requests:
-            return []
-        
-        # Get all request IDs
-        request_ids = [req['id'] for req in requests]
-        
-        # Get all price tracking entries (which now includes latest search result data)
-        price_tracking_result = supabase.table('price_tracking').select('*').in_('search_request_id', request_ids).execute()
-        price_tracking_map = {
-            pt['search_request_id']: pt 
-            for pt in (price_tracking_result.data if price_tracking_result.data else [])
-        }
-        
-        # Attach tracking to requests
+        # PostgREST embeds one-to-many relations as a list; callers expect a single row (or None)
         for req in requests:
-            req['price_tracking'] = price_tracking_map.get(req['id'])
+            tracking = req.get('price_tracking')
+            if isinstance(tracking, list):
+                req['price_tracking'] = tracking[0] if tracking else None
         
         return requests
-    except Exception as e:
-        print(f"Error getting search requests with tracking: {e}")
+    except Exception:
+        logger.exception("Error getting search requests with tracking")
         return []
 
-def get_all_active_search_requests() -> List[Dict]:
+def get_all_active_search_requests(columns: str = '*', page_size: int = _ACTIVE_PAGE_SIZE) -> List[Dict]:
     """
     Get all search requests with future departure dates.
     Used by automated scripts to check flights for all active requests.
     
+    Args:
+        columns: search_requests columns to select
+        page_size: rows fetched per round-trip
+    
     Returns:
         List of search request dictionaries with departure_date >= today
+    
+    Rows are read a page at a time with .range(), since PostgREST caps the rows
+    returned by a single request.
     """
     supabase = get_supabase_client()
     try:
-        from datetime import date
-        
         today = date.today().isoformat()
         
-        # Get all search requests where departure_date >= today
-        result = supabase.table('search_requests').select('*').gte('departure_date', today).order('departure_date', desc=False).execute()
-        
-        return result.data if result.data else []
-    except Exception as e:
-        print(f"Error getting all active search requests: {e}")
+        # Get all search requests where departure_date >= today; id breaks ties so pages don't overlap
+        rows = []
+        offset = 0
+        while True:
+            result = _execute(
+                supabase.table('search_requests')
+                .select(columns)
+                .gte('departure_date', today)
+                .order('departure_date', desc=False)
+                .order('id', desc=False)
+                .range(offset, offset + page_size - 1)
+            )
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            offset += page_size
+    except Exception:
+        logger.exception("Error getting all active search requests")
         return []
 
-def get_search_request_by_id(request_id: str, user_id: str) -> Optional[Dict]:
-    """Get a specific search request by ID (with user validation)"""
+def get_dashboard_version(user_id: str) -> Optional[Dict]:
+    """
+    Summary of a user's dashboard data, used as a cheap ETag validator
+    
+    Runs the dashboard_version Postgres function, which returns the number of
+    search requests and the latest created/updated and last_checked
+    timestamps, so an unchanged dashboard can be answered without loading it.
+    
+    Returns:
+        Dict with request_count, requests_changed_at and tracking_checked_at,
+        or None if it could not be read
+    """
     supabase = get_supabase_client()
     try:
-        result = supabase.table('search_requests').select('*').eq('id', request_id).eq('user_id', user_id).execute()
-        
-        if result.data and len(result.data) > 0:
-            return result.data[0]
+        return _fetch_one(supabase.rpc('dashboard_version', {'uid': user_id}))
+    except Exception:
+        logger.exception("Error getting dashboard version")
         return None
-    except Exception as e:
-        print(f"Error getting search request: {e}")
+
+def get_search_request_by_id(request_id: str, user_id: str, columns: str = '*') -> Optional[Dict]:
+    """Get a specific search request by ID (with user validation)"""
+    supabase = get_supabase_client()
+    try:
+        return _fetch_one(supabase.table('search_requests').select(columns).eq('id', request_id).eq('user_id', user_id))
+    except Exception:
+        logger.exception("Error getting search request")
         return None
 
 def update_search_request(request_id: str, user_id: str, **kwargs) -> Optional[Dict]:
     """Update a search request"""
     supabase = get_supabase_client()
     try:
-        # First verify ownership
-        request = get_search_request_by_id(request_id, user_id)
-        if not request:
-            return None
+        # Keep the precomputed SerpAPI parameters in sync with the search fields
+        if all(field in kwargs for field in _SEARCH_FIELDS):
+            kwargs['serpapi_params'] = _build_serpapi_params(kwargs)
+        # Bumps the dashboard validator (see get_dashboard_version)
+        kwargs['updated_at'] = datetime.now(timezone.utc).isoformat()
         
-        result = supabase.table('search_requests').update(kwargs).eq('id', request_id).execute()
+        # Ownership is enforced by the user_id filter; no matching row means
+        # the request doesn't exist or belongs to someone else
+        result = _execute(supabase.table('search_requests').update(kwargs).eq('id', request_id).eq('user_id', user_id))
         
         if result.data:
             return result.data[0]
         return None
-    except Exception as e:
-        print(f"Error updating search request: {e}")
+    except Exception:
+        logger.exception("Error updating search request")
         return None
 
 def delete_search_request(request_id: str, user_id: str) -> bool:
     """Delete a search request (cascade will delete price_tracking)"""
     supabase = get_supabase_client()
     try:
-        # First verify ownership
-        request = get_search_request_by_id(request_id, user_id)
-        if not request:
-            return False
-        
-        supabase.table('search_requests').delete().eq('id', request_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error deleting search request: {e}")
+        # Ownership is enforced by the user_id filter; an empty result means
+        # nothing was deleted
+        result = _execute(supabase.table('search_requests').delete().eq('id', request_id).eq('user_id', user_id))
+        return bool(result.data)
+    except Exception:
+        logger.exception("Error deleting search request")
         return False
 
 def create_price_tracking(search_request_id: str) -> Optional[Dict]:
     """Create initial price tracking entry"""
     supabase = get_supabase_client()
     try:
-        result = supabase.table('price_tracking').insert({
-            'search_request_id': search_request_id,
-            'minimum_price': None,
-            'last_checked': None,
-            'last_notified_price': None
-        }).execute()
+        # Remaining columns start out NULL; last_checked is stamped with NOW() by the update functions
+        result = _execute(supabase.table('price_tracking').insert({
+            'search_request_id': search_request_id
+        }))
         
         if result.data:
             return result.data[0]
         return None
-    except Exception as e:
-        print(f"Error creating price tracking: {e}")
+    except Exception:
+        logger.exception("Error creating price tracking")
         return None
 
+def invalidate_price_tracking(search_request_id: str) -> None:
+    """Drop a cached price tracking row so the next lookup hits the database"""
+    with _tracking_cache_lock:
+        _tracking_cache.pop(search_request_id, None)
+
 def get_price_tracking(search_request_id: str) -> Optional[Dict]:
-    """Get price tracking for a search request"""
+    """Get price tracking for a search request (cached for a few seconds)"""
+    with _tracking_cache_lock:
+        cached = _tracking_cache.get(search_request_id, _MISSING)
+    if cached is not _MISSING:
+        return cached
+    
     supabase = get_supabase_client()
     try:
-        result = supabase.table('price_tracking').select('*').eq('search_request_id', search_request_id).execute()
-        
-        if result.data and len(result.data) > 0:
-            return result.data[0]
-        return None
-    except Exception as e:
-        print(f"Error getting price tracking: {e}")
+        tracking = _fetch_one(supabase.table('price_tracking').select('*').eq('search_request_id', search_request_id))
+        with _tracking_cache_lock:
+            _tracking_cache[search_request_id] = tracking
+        return tracking
+    except Exception:
+        logger.exception("Error getting price tracking")
         return None
 
+def get_price_tracking_bulk(search_request_ids: Iterable[str]) -> List[Dict]:
+    """Get price tracking rows for several search requests in as few queries as possible"""
+    supabase = get_supabase_client()
+    try:
+        rows = []
+        for chunk in _chunks(list(search_request_ids)):
+            result = _execute(supabase.table('price_tracking').select('*').in_('search_request_id', chunk))
+            rows.extend(result.data or [])
+        return rows
+    except Exception:
+        logger.exception("Error getting price tracking in bulk")
+        return []
+
 def update_price_tracking(search_request_id: str, minimum_price: Optional[float]) -> Optional[Dict]:
     """
     Update price tracking with new minimum price and last checked timestamp.
     This is a basic update that only sets the minimum price and timestamp.
     Use update_price_tracking_with_result() to also store search result details.
+    
+    The minimum is computed in Postgres (LEAST) by the update_price_tracking_min
+    function, so this is a single atomic round-trip.
     """
     supabase = get_supabase_client()
     try:
-        from datetime import datetime
-        
-        # Get current tracking to preserve existing minimum_price if new one is higher
-        current_tracking = get_price_tracking(search_request_id)
-        final_minimum_price = minimum_price
-        
-        if current_tracking and current_tracking.get('minimum_price') is not None:
-            if minimum_price is not None:
-                # Only update if new price is lower (better deal)
-                final_minimum_price = min(float(current_tracking['minimum_price']), float(minimum_price))
-            else:
-                # Keep existing minimum if new price is None
-                final_minimum_price = current_tracking['minimum_price']
-        
-        update_data = {
-            'minimum_price': final_minimum_price,
-            'last_checked': datetime.utcnow().isoformat()
-        }
-        
-        result = supabase.table('price_tracking').update(update_data).eq('search_request_id', search_request_id).execute()
+        result = _execute(supabase.rpc('update_price_tracking_min', {
+            'sr_id': search_request_id,
+            'new_price': minimum_price
+        }))
+        invalidate_price_tracking(search_request_id)
         
         if result.data:
             return result.data[0]
         return None
-    except Exception as e:
-        print(f"Error updating price tracking: {e}")
+    except Exception:
+        logger.exception("Error updating price tracking")
         return None
 
 def update_price_tracking_with_result(search_request_id: str, price: Optional[float],
@@ -302,56 +554,88 @@ def update_price_tracking_with_result(search_request_id: str, price: Optional[fl
     Update price tracking with new search result data.
     This consolidates the search result into the price_tracking table.
     Also updates minimum_price if the new price is lower.
+    
+    The whole update runs in the update_price_tracking_result Postgres function,
+    so the minimum price is compared and written atomically in one round-trip.
     """
     supabase = get_supabase_client()
     try:
-        from datetime import datetime
-        
-        # Get current tracking to determine minimum price
-        current_tracking = get_price_tracking(search_request_id)
-        minimum_price = price
-        
-        if current_tracking and current_tracking.get('minimum_price') is not None:
-            if price is not None:
-                # Update minimum price if new price is lower (better deal)
-                minimum_price = min(float(current_tracking['minimum_price']), float(price))
-            else:
-                # Keep existing minimum if new price is None
-                minimum_price = current_tracking['minimum_price']
-        elif price is None:
-            minimum_price = None
-        
         resolved_link = flight_link
         if not resolved_link and isinstance(flight_details, dict):
             resolved_link = flight_details.get('link')
 
-        update_data = {
-            'latest_price': price,
-            'currency': currency,
-            'airlines': airlines,
-            'flight_details': flight_details,  # Supabase will handle JSONB
-            'minimum_price': minimum_price,
-            'last_checked': datetime.utcnow().isoformat(),
-            'flight_link': resolved_link
-        }
-        
-        result = supabase.table('price_tracking').update(update_data).eq('search_request_id', search_request_id).execute()
+        result = _execute(supabase.rpc('update_price_tracking_result', {
+            'sr_id': search_request_id,
+            'new_price': price,
+            'new_currency': currency,
+            'new_airlines': airlines,
+            'new_flight_details': flight_details,  # Supabase will handle JSONB
+            'new_flight_link': resolved_link
+        }))
+        invalidate_price_tracking(search_request_id)
         
         if result.data:
             return result.data[0]
         return None
-    except Exception as e:
-        print(f"Error updating price tracking with result: {e}")
+    except Exception:
+        logger.exception("Error updating price tracking with result")
         return None
 
 
+def bulk_update_price_tracking(rows: List[Dict]) -> List[Dict]:
+    """
+    Store search results for many search requests in one round-trip.
+    
+    Args:
+        rows: Dicts with search_request_id, price, currency, airlines,
+              flight_details and (optionally) flight_link
+    
+    Returns:
+        The updated price_tracking rows
+    
+    Runs the bulk_update_price_tracking Postgres function, which applies the
+    same LEAST() minimum logic as update_price_tracking_with_result.
+    """
+    if not rows:
+        return []
+    
+    payload = []
+    for row in rows:
+        flight_details = row.get('flight_details')
+        flight_link = row.get('flight_link')
+        if not flight_link and isinstance(flight_details, dict):
+            flight_link = flight_details.get('link')
+        payload.append({
+            'search_request_id': row['search_request_id'],
+            'price': row.get('price'),
+            'currency': row.get('currency'),
+            'airlines': row.get('airlines'),
+            'flight_details': flight_details,
+            'flight_link': flight_link
+        })
+    
+    supabase = get_supabase_client()
+    updated = []
+    # A failed chunk is logged and skipped so the rest of the run's results are still stored
+    for chunk in _chunks(payload, _WRITE_CHUNK_SIZE):
+        try:
+            result = _execute(supabase.rpc('bulk_update_price_tracking', {'updates': chunk}))
+            updated.extend(result.data or [])
+        except Exception:
+            logger.exception("Error bulk updating price tracking (%d rows)", len(chunk))
+        finally:
+            for row in chunk:
+                invalidate_price_tracking(row['search_request_id'])
+    return updated
+
+
 def mark_price_notified(search_request_id: str, notified_price: Optional[float]) -> Optional[Dict]:
     """
     Record the last price we sent an alert for.
     This relies on the existing last_notified_price column in price_tracking.
     """
     if notified_price is None:
-        print(f"Warning: Cannot mark price as notified - notified_price is None")
+        logger.warning("Cannot mark price as notified - notified_price is None")
         return None
 
     supabase = get_supabase_client()
@@ -360,17 +644,116 @@ def mark_price_notified(search_request_id: str, notified_price: Optional[float])
             'last_notified_price': float(notified_price),
         }
 
-        result = supabase.table('price_tracking').update(update_data).eq('search_request_id', search_request_id).execute()
+        result = _execute(supabase.table('price_tracking').update(update_data).eq('search_request_id', search_request_id))
+        invalidate_price_tracking(search_request_id)
 
         if result.data:
-            print(f"Successfully updated last_notified_price to ${float(notified_price):.2f} for request {search_request_id}")
+            logger.info("Updated last_notified_price to %.2f for request %s", float(notified_price), search_request_id)
             return result.data[0]
         else:
-            print(f"Warning: mark_price_notified returned no data for request {search_request_id}")
+            logger.warning("mark_price_notified returned no data for request %s", search_request_id)
             return None
-    except Exception as e:
-        print(f"Error marking price as notified: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error marking price as notified for request %s", search_request_id)
         return None
 
+def mark_price_notified_bulk(notified: Iterable) -> List[Dict]:
+    """
+    Record last_notified_price for many search requests in one round-trip.
+    
+    Args:
+        notified: (search_request_id, notified_price) pairs; pairs without a price are skipped
+    
+    Returns:
+        The updated price_tracking rows
+    """
+    payload = [
+        {'search_request_id': search_request_id, 'notified_price': float(notified_price)}
+        for search_request_id, notified_price in notified
+        if notified_price is not None
+    ]
+    if not payload:
+        return []
+    
+    supabase = get_supabase_client()
+    updated = []
+    for chunk in _chunks(payload, _WRITE_CHUNK_SIZE):
+        try:
+            result = _execute(supabase.rpc('mark_price_notified_bulk', {'updates': chunk}))
+            updated.extend(result.data or [])
+        except Exception:
+            logger.exception("Error bulk marking prices as notified (%d rows)", len(chunk))
+        finally:
+            for row in chunk:
+                invalidate_price_tracking(row['search_request_id'])
+    return updated
+
+def get_cached_search_results(keys: Iterable[str], max_age_seconds: int) -> Dict[str, Dict]:
+    """
+    Get stored SerpAPI results fetched within the last max_age_seconds.
+    
+    Returns:
+        {key: search result} for the keys with a fresh entry
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)).isoformat()
+    supabase = get_supabase_client()
+    try:
+        cached = {}
+        for chunk in _chunks(keys):
+            result = _execute(
+                supabase.table('serpapi_cache').select('key, response').in_('key', chunk).gte('fetched_at', cutoff)
+            )
+            cached.update((row['key'], row['response']) for row in result.data or [])
+        return cached
+    except Exception:
+        logger.exception("Error getting cached search results")
+        return {}
+
+def store_search_results(results: Dict[str, Dict]) -> None:
+    """Store SerpAPI results by key, replacing older entries"""
+    if not results:
+        return
+    
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    rows = [{'key': key, 'response': response, 'fetched_at': fetched_at} for key, response in results.items()]
+    supabase = get_supabase_client()
+    for chunk in _chunks(rows, _WRITE_CHUNK_SIZE):
+        try:
+            _execute(supabase.table('serpapi_cache').upsert(chunk, on_conflict='key'))
+        except Exception:
+            logger.exception("Error storing search results (%d rows)", len(chunk))
+
+def record_flight_check_errors(errors: List[Dict]) -> None:
+    """
+    Store failed checks from a scheduled run in one batched insert.
+    
+    Error messages are scrubbed of the SerpAPI key before they are stored.
+    
+    Args:
+        errors: Dicts with request_id, route and error
+    """
+    if not errors:
+        return
+    
+    from app.serpapi_service import redact_api_key
+    
+    occurred_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {
+            'search_request_id': error['request_id'],
+            'route': error.get('route'),
+            'error': redact_api_key(str(error['error'])),
+            'occurred_at': occurred_at,
+        }
+        for error in errors
+    ]
+    supabase = get_supabase_client()
+    for chunk in _chunks(rows, _WRITE_CHUNK_SIZE):
+        try:
+            _execute(supabase.table('flight_check_errors').insert(chunk))
+        except Exception:
+            logger.exception("Error recording flight check errors (%d rows)", len(chunk))
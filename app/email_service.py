@@ -1,70 +1,176 @@
+import logging
 import os
+import queue
 import smtplib
-from email.mime.text import MIMEText
-from typing import Optional
+import threading
+from email.message import EmailMessage
+from email.policy import SMTP, SMTPUTF8
+from typing import Callable, List, Optional
+
+from app.mail import smtp_pool
+
+logger = logging.getLogger(__name__)
+
+# Price-drop emails waiting to be sent by the background workers
+EMAIL_WORKER_COUNT = 4
+_email_queue = queue.Queue(maxsize=10_000)
+_workers_started = False
+_workers_lock = threading.Lock()
+
+
+def _build_message(from_email: str, to_header: str, subject: str, html_body: str,
+                   international: bool = False) -> EmailMessage:
+    """
+    Build an HTML price-drop email.
+
+    The body is quoted-printable, so it is 7-bit clean and long HTML lines are
+    folded under the SMTP line limit. Internationalised (non-ASCII) addresses
+    need the SMTPUTF8 policy, which send_message() negotiates with the server.
+    """
+    message = EmailMessage(policy=SMTPUTF8 if international else SMTP)
+    message["From"] = from_email
+    message["To"] = to_header
+    message["Subject"] = subject
+    message.set_content(html_body, subtype="html", charset="utf-8", cte="quoted-printable")
+    return message
+
+
+# Gmail SMTP credentials, kept once they have been found in the environment
+_gmail_credentials: Optional[tuple[str, str]] = None
 
 
 def _get_gmail_credentials() -> Optional[tuple[str, str]]:
     """
-    Fetch Gmail SMTP credentials from environment.
+    Fetch Gmail SMTP credentials from environment (read once per process
+    after they are found; missing credentials are looked up again next time,
+    so a process started before the environment is loaded can still send).
 
     Expects:
     - GMAIL_USER
     - GMAIL_APP_PASSWORD
     """
+    global _gmail_credentials
+    if _gmail_credentials is not None:
+        return _gmail_credentials
+
     user = os.getenv("GMAIL_USER")
     app_password = os.getenv("GMAIL_APP_PASSWORD")
 
     if not user or not app_password:
-        print("Gmail SMTP not configured: GMAIL_USER and/or GMAIL_APP_PASSWORD missing.")
+        logger.error("Gmail SMTP not configured: GMAIL_USER and/or GMAIL_APP_PASSWORD missing.")
         return None
 
-    return user, app_password
+    _gmail_credentials = (user, app_password)
+    return _gmail_credentials
 
 
-def send_price_drop_email(to_email: str, subject: str, html_body: str, dry_run: bool = False) -> bool:
+def send_price_drop_email(to_email: str, subject: str, html_body: str, dry_run: bool = False,
+                          on_sent: Optional[Callable[[List[str]], None]] = None) -> bool:
     """
-    Send a price-drop email via Gmail SMTP.
+    Queue a price-drop email for delivery via Gmail SMTP on a background worker.
 
     If dry_run is True, this will only log what would be sent.
+    on_sent is called from the worker once the email has actually been sent,
+    with the recipient addresses the server accepted; call flush_email_queue()
+    before exiting so queued emails are delivered.
     
     Returns:
-        True if email was sent successfully (or dry_run), False otherwise
+        True if the email was queued (or dry_run), False otherwise
+    """
+    return send_price_drop_email_bulk([to_email], subject, html_body, dry_run=dry_run, on_sent=on_sent)
+
+
+def send_price_drop_email_bulk(to_emails: List[str], subject: str, html_body: str, dry_run: bool = False,
+                               on_sent: Optional[Callable[[List[str]], None]] = None) -> bool:
     """
+    Queue one price-drop email for several recipients.
+
+    The message is sent once, with every distinct address as an SMTP recipient
+    (BCC'd, so recipients don't see each other). Otherwise behaves like
+    send_price_drop_email().
+    """
+    to_emails = list(dict.fromkeys(to_emails))
+    recipients = ", ".join(to_emails)
     if dry_run:
-        print(f"[DRY RUN] Would send price-drop email to {to_email} with subject '{subject}'.")
+        logger.info("[DRY RUN] Would send price-drop email to %s with subject '%s'.", recipients, subject)
         return True
 
+    _start_workers()
+    try:
+        _email_queue.put_nowait((to_emails, subject, html_body, on_sent))
+    except queue.Full:
+        logger.error("Email queue is full; dropping price-drop email to %s", recipients)
+        return False
+    return True
+
+
+def flush_email_queue() -> None:
+    """Block until every queued email has been handled"""
+    _email_queue.join()
+
+
+def _start_workers() -> None:
+    global _workers_started
+    with _workers_lock:
+        if _workers_started:
+            return
+        for i in range(EMAIL_WORKER_COUNT):
+            threading.Thread(target=_email_worker, name=f"email-worker-{i}", daemon=True).start()
+        _workers_started = True
+
+
+def _email_worker() -> None:
+    while True:
+        to_emails, subject, html_body, on_sent = _email_queue.get()
+        try:
+            accepted = _send_now(to_emails, subject, html_body)
+            if accepted and on_sent is not None:
+                on_sent(accepted)
+        except Exception:
+            logger.exception("Email worker failed for %s", ", ".join(to_emails))
+        finally:
+            _email_queue.task_done()
+
+
+def _send_now(to_emails: List[str], subject: str, html_body: str) -> List[str]:
+    """
+    Send a price-drop email via Gmail SMTP right away, in a single SMTP transaction.
+    
+    Returns:
+        The addresses the server accepted (empty if nothing was sent)
+    """
+    recipients = ", ".join(to_emails)
     creds = _get_gmail_credentials()
     if creds is None:
         # Already logged a helpful message
-        print(f"ERROR: Cannot send price-drop email to {to_email} - Gmail credentials missing")
-        return False
+        logger.error("Cannot send price-drop email to %s - Gmail credentials missing", recipients)
+        return []
 
     user, app_password = creds
 
-    msg = MIMEText(html_body, "html")
-    msg["Subject"] = subject
-    msg["From"] = user
-    msg["To"] = to_email
+    # With several recipients the To header shows only the sender; the real
+    # addresses go in the envelope, so they are effectively BCC'd
+    to_header = to_emails[0] if len(to_emails) == 1 else user
+    international = not all(address.isascii() for address in (user, *to_emails))
 
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587, timeout=10) as server:
-            server.starttls()
-            server.login(user, app_password)
-            server.send_message(msg)
-        print(f"✓ Successfully sent price-drop email to {to_email}")
-        return True
+        message = _build_message(user, to_header, subject, html_body, international)
+        with smtp_pool.connection("smtp.gmail.com", 587, user, app_password) as server:
+            # send_message() negotiates SMTPUTF8 for non-ASCII addresses
+            refused = server.send_message(message, user, to_emails)
+        # The server can reject some recipients and still take the message for the rest
+        if refused:
+            logger.warning("SMTP server refused price-drop email for some recipients: %s", refused)
+        accepted = [address for address in to_emails if address not in refused]
+        logger.info("Sent price-drop email to %s", ", ".join(accepted))
+        return accepted
     except smtplib.SMTPAuthenticationError as e:
-        print(f"✗ ERROR: SMTP Authentication failed when sending to {to_email}: {e}")
-        print(f"  Check that GMAIL_USER and GMAIL_APP_PASSWORD are correct")
-        return False
+        logger.error("SMTP authentication failed when sending to %s: %s "
+                     "(check that GMAIL_USER and GMAIL_APP_PASSWORD are correct)", recipients, e)
+        return []
     except smtplib.SMTPException as e:
-        print(f"✗ ERROR: SMTP error when sending to {to_email}: {e}")
-        return False
-    except Exception as e:
-        print(f"✗ ERROR: Unexpected error sending email to {to_email}: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
+        logger.error("SMTP error when sending to %s: %s", recipients, e)
+        return []
+    except Exception:
+        logger.exception("Unexpected error sending email to %s", recipients)
+        return []
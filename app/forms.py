@@ -1,10 +1,13 @@
+import hmac
 from flask_wtf import FlaskForm
 from wtforms import StringField, IntegerField, RadioField, SelectMultipleField, SelectField, DateField, PasswordField
 from wtforms.validators import DataRequired, Email, NumberRange, ValidationError, Optional
+from wtforms.widgets import Select, html_params
+from markupsafe import Markup
 from datetime import date
 
-# Hardcoded airports list for dropdowns
-AIRPORTS = [
+# Hardcoded airports list for dropdowns (a tuple, built once at import)
+AIRPORTS = (
     # Major US Airports
     ('ATL', 'ATL - Hartsfield-Jackson Atlanta International Airport'),
     ('LAX', 'LAX - Los Angeles International Airport'),
@@ -98,10 +101,10 @@ AIRPORTS = [
     ('CAN', 'CAN - Guangzhou Baiyun International Airport'),
     ('SZX', 'SZX - Shenzhen Bao\'an International Airport'),
     ('CTU', 'CTU - Chengdu Shuangliu International Airport'),
-]
+)
 
 # Expanded airlines list for the dropdown
-AIRLINES = [
+AIRLINES = (
     # US Airlines
     ('Delta', 'Delta Air Lines'),
     ('United', 'United Airlines'),
@@ -136,7 +139,40 @@ AIRLINES = [
     ('Swiss', 'Swiss International Air Lines'),
     ('Austrian', 'Austrian Airlines'),
     ('Scandinavian', 'Scandinavian Airlines'),
-]
+)
+
+# Valid submitted values, checked with a set lookup instead of WTForms' scan over the choices
+_AIRPORT_CODES = frozenset(code for code, _ in AIRPORTS)
+_AIRLINE_NAMES = frozenset(name for name, _ in AIRLINES)
+
+class StaticSelect(Select):
+    """
+    Select widget for a fixed choice list: the <option> markup is rendered once
+    and reused, with only the selected option swapped in per render.
+    """
+    def __init__(self, choices):
+        super().__init__()
+        self._option_variants = {}
+        options = []
+        for value, label in choices:
+            plain = str(self.render_option(value, label, False))
+            self._option_variants[value] = (plain, str(self.render_option(value, label, True)))
+            options.append(plain)
+        self._options_html = ''.join(options)
+    
+    def __call__(self, field, **kwargs):
+        kwargs.setdefault('id', field.id)
+        flags = getattr(field, 'flags', {})
+        for k in self.validation_attrs:
+            if k not in kwargs and getattr(flags, k, False):
+                kwargs[k] = True
+        options_html = self._options_html
+        variants = self._option_variants.get(field.data)
+        if variants:
+            options_html = options_html.replace(variants[0], variants[1], 1)
+        return Markup(f'<select {html_params(name=field.name, **kwargs)}>{options_html}</select>')
+
+_AIRPORT_SELECT = StaticSelect(AIRPORTS)
 
 class SignupForm(FlaskForm):
     email = StringField('Email', validators=[DataRequired(), Email()])
@@ -144,7 +180,10 @@ class SignupForm(FlaskForm):
     confirm_password = PasswordField('Confirm Password', validators=[DataRequired()])
     
     def validate_confirm_password(self, field):
-        if self.password.data != field.data:
+        # Constant-time compare; encoded first because compare_digest only takes ASCII str
+        password = (self.password.data or '').encode('utf-8')
+        confirm = (field.data or '').encode('utf-8')
+        if not hmac.compare_digest(password, confirm):
             raise ValidationError('Passwords must match.')
 
 class LoginForm(FlaskForm):
@@ -152,8 +191,10 @@ class LoginForm(FlaskForm):
     password = PasswordField('Password', validators=[DataRequired()])
 
 class SearchRequestForm(FlaskForm):
-    depart_from = SelectField('Depart From', choices=AIRPORTS, validators=[DataRequired()])
-    arrive_at = SelectField('Arrive At', choices=AIRPORTS, validators=[DataRequired()])
+    depart_from = SelectField('Depart From', choices=AIRPORTS, validators=[DataRequired()],
+                              validate_choice=False, widget=_AIRPORT_SELECT)
+    arrive_at = SelectField('Arrive At', choices=AIRPORTS, validators=[DataRequired()],
+                            validate_choice=False, widget=_AIRPORT_SELECT)
     departure_date = DateField('Departure Date', validators=[DataRequired()],
                                format='%Y-%m-%d')
     return_date = DateField('Return Date', validators=[Optional()],
@@ -169,14 +210,29 @@ class SearchRequestForm(FlaskForm):
                        default=0,
                        coerce=int)
     preferred_airlines = SelectMultipleField('Preferred Airlines', choices=AIRLINES,
-                                            validators=[Optional()])
+                                            validators=[Optional()], validate_choice=False)
+    
+    def validate_depart_from(self, field):
+        if field.data not in _AIRPORT_CODES:
+            raise ValidationError('Not a valid choice.')
+    
+    def validate_arrive_at(self, field):
+        if field.data not in _AIRPORT_CODES:
+            raise ValidationError('Not a valid choice.')
+    
+    def validate_preferred_airlines(self, field):
+        if field.data and not _AIRLINE_NAMES.issuperset(field.data):
+            raise ValidationError('Not a valid choice.')
     
     def validate_return_date(self, field):
-        if self.trip_type.data == 'round_trip':
-            if not field.data:
-                raise ValidationError('Return date is required for round trip.')
-            if self.departure_date.data and field.data and field.data < self.departure_date.data:
-                raise ValidationError('Return date must be on or after departure date.')
+        # One-way trips never use the return date
+        if self.trip_type.data != 'round_trip':
+            return
+        if not field.data:
+            raise ValidationError('Return date is required for round trip.')
+        departure_date = self.departure_date.data
+        if departure_date and field.data < departure_date:
+            raise ValidationError('Return date must be on or after departure date.')
     
     def validate_departure_date(self, field):
         if field.data and field.data < date.today():
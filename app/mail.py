@@ -1,11 +1,120 @@
 """
 Mail utilities for sending transactional emails via Gmail SMTP.
 """
+from contextlib import contextmanager
 from email.message import EmailMessage
+import atexit
+import logging
+import queue
 import smtplib
+import threading
 
 from flask import current_app
 
+logger = logging.getLogger(__name__)
+
+
+class _PlainAuthSMTP(smtplib.SMTP):
+    """SMTP client that authenticates with AUTH PLAIN only, skipping smtplib's mechanism fallback"""
+
+    def login(self, user, password, *, initial_response_ok=True):
+        self.ehlo_or_helo_if_needed()
+        if not self.has_extn('auth'):
+            raise smtplib.SMTPNotSupportedError("SMTP AUTH extension not supported by server.")
+        self.user, self.password = user, password
+        return self.auth('PLAIN', self.auth_plain, initial_response_ok=initial_response_ok)
+
+
+class SMTPConnectionPool:
+    """
+    Process-wide pool of logged-in SMTP connections, reused across sends so
+    each email skips the connect + STARTTLS + AUTH handshake.
+    """
+
+    # Gmail drops connections after roughly this many messages, so recycle before then
+    MAX_MESSAGES_PER_CONNECTION = 100
+
+    def __init__(self, max_idle: int = 4):
+        self._max_idle = max_idle
+        self._idle: dict[tuple, queue.Queue] = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, key: tuple) -> queue.Queue:
+        with self._lock:
+            if key not in self._idle:
+                self._idle[key] = queue.Queue(maxsize=self._max_idle)
+            return self._idle[key]
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _acquire(self, key: tuple) -> tuple[smtplib.SMTP, int]:
+        idle = self._queue(key)
+        while True:
+            try:
+                server, sent = idle.get_nowait()
+            except queue.Empty:
+                break
+            # Idle connections may have been closed by the server; check before reuse
+            try:
+                if server.noop()[0] == 250:
+                    return server, sent
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._quit(server)
+
+        host, port, username, password = key
+        server = _PlainAuthSMTP(host, port, timeout=10)
+        try:
+            server.starttls()
+            server.login(username, password)
+        except Exception:
+            self._quit(server)
+            raise
+        return server, 0
+
+    def _release(self, key: tuple, server: smtplib.SMTP, sent: int) -> None:
+        if sent >= self.MAX_MESSAGES_PER_CONNECTION:
+            self._quit(server)
+            return
+        try:
+            self._queue(key).put_nowait((server, sent))
+        except queue.Full:
+            self._quit(server)
+
+    @contextmanager
+    def connection(self, host: str, port: int, username: str, password: str):
+        """Yield a logged-in SMTP connection; it goes back to the pool unless the block raised"""
+        key = (host, int(port), username, password)
+        server, sent = self._acquire(key)
+        try:
+            yield server
+        except Exception:
+            self._quit(server)
+            raise
+        self._release(key, server, sent + 1)
+
+    def close_all(self) -> None:
+        """Quit every idle connection"""
+        with self._lock:
+            queues = list(self._idle.values())
+            self._idle.clear()
+        for idle in queues:
+            while True:
+                try:
+                    server, _ = idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._quit(server)
+
+
+smtp_pool = SMTPConnectionPool()
+atexit.register(smtp_pool.close_all)
+
 
 def send_email(to: str, subject: str, text: str, html: str | None = None) -> bool:
     """
@@ -20,7 +129,7 @@ def send_email(to: str, subject: str, text: str, html: str | None = None) -> boo
     from_email = current_app.config.get('GMAIL_FROM_EMAIL', username)
 
     if not username or not app_password or not from_email:
-        print("Gmail configuration missing; cannot send email.")
+        logger.error("Gmail configuration missing; cannot send email.")
         return False
 
     msg = EmailMessage()
@@ -33,11 +142,9 @@ def send_email(to: str, subject: str, text: str, html: str | None = None) -> boo
         msg.add_alternative(html, subtype='html')
 
     try:
-        with smtplib.SMTP(smtp_server, smtp_port, timeout=10) as server:
-            server.starttls()
-            server.login(username, app_password)
+        with smtp_pool.connection(smtp_server, smtp_port, username, app_password) as server:
             server.send_message(msg)
         return True
-    except Exception as exc:  # noqa: BLE001
-        print(f"Error sending Gmail email: {exc}")
+    except Exception:  # noqa: BLE001
+        logger.exception("Error sending Gmail email to %s", to)
         return False
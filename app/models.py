@@ -2,11 +2,22 @@
 Data models and helper functions for database entities
 """
 
-from typing import Optional, Dict, List
+from types import MappingProxyType
+from typing import Any, Optional, Dict, List
 from datetime import datetime
 
+# Shared read-only defaults for missing list/JSON columns, so empty rows don't allocate
+_EMPTY_TUPLE = ()
+_EMPTY_DICT = MappingProxyType({})
+
+def _f(value: Any) -> Optional[float]:
+    """Convert a numeric column value to float, keeping NULL as None"""
+    return float(value) if value is not None else None
+
 class User:
     """User model"""
+    __slots__ = ('id', 'email', 'password_hash', 'created_at')
+    
     def __init__(self, id: str, email: str, password_hash: str, created_at: Optional[str] = None):
         self.id = id
         self.email = email
@@ -25,6 +36,9 @@ class User:
 
 class SearchRequest:
     """Search request model"""
+    __slots__ = ('id', 'user_id', 'depart_from', 'arrive_at', 'departure_date', 'return_date',
+                 'trip_type', 'preferred_airlines', 'stops', 'created_at')
+    
     def __init__(self, id: str, user_id: str, depart_from: str, arrive_at: str,
                  departure_date: str, return_date: Optional[str],
                  trip_type: str, preferred_airlines: Optional[List[str]],
@@ -36,7 +50,7 @@ class SearchRequest:
         self.departure_date = departure_date
         self.return_date = return_date
         self.trip_type = trip_type
-        self.preferred_airlines = preferred_airlines or []
+        self.preferred_airlines = preferred_airlines or _EMPTY_TUPLE
         self.stops = stops
         self.created_at = created_at
     
@@ -66,13 +80,16 @@ class SearchRequest:
             'departure_date': self.departure_date,
             'return_date': self.return_date,
             'trip_type': self.trip_type,
-            'preferred_airlines': self.preferred_airlines,
+            'preferred_airlines': list(self.preferred_airlines),
             'stops': self.stops,
             'created_at': self.created_at
         }
 
 class PriceTracking:
     """Price tracking model - now includes latest search result data"""
+    __slots__ = ('id', 'search_request_id', 'minimum_price', 'last_checked', 'last_notified_price',
+                 'latest_price', 'currency', 'airlines', 'flight_details')
+    
     def __init__(self, id: str, search_request_id: str, minimum_price: Optional[float],
                  last_checked: Optional[str], last_notified_price: Optional[float],
                  latest_price: Optional[float] = None, currency: str = 'USD',
@@ -84,21 +101,22 @@ class PriceTracking:
         self.last_notified_price = last_notified_price
         self.latest_price = latest_price
         self.currency = currency
-        self.airlines = airlines or []
-        self.flight_details = flight_details or {}
+        self.airlines = airlines or _EMPTY_TUPLE
+        self.flight_details = flight_details or _EMPTY_DICT
     
     @classmethod
     def from_dict(cls, data: Dict):
         """Create PriceTracking from dictionary"""
+        get = data.get
         return cls(
             id=data['id'],
             search_request_id=data['search_request_id'],
-            minimum_price=float(data['minimum_price']) if data.get('minimum_price') else None,
-            last_checked=data.get('last_checked'),
-            last_notified_price=float(data['last_notified_price']) if data.get('last_notified_price') else None,
-            latest_price=float(data['latest_price']) if data.get('latest_price') else None,
-            currency=data.get('currency', 'USD'),
-            airlines=data.get('airlines', []),
-            flight_details=data.get('flight_details', {})
+            minimum_price=_f(get('minimum_price')),
+            last_checked=get('last_checked'),
+            last_notified_price=_f(get('last_notified_price')),
+            latest_price=_f(get('latest_price')),
+            currency=get('currency', 'USD'),
+            airlines=get('airlines'),
+            flight_details=get('flight_details')
         )
 
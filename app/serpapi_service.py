@@ -1,18 +1,37 @@
 """
 SerpAPI service for searching flights using Google Flights API
 """
+import asyncio
+import hashlib
+import logging
+import random
 import re
+import threading
+import time
+from functools import lru_cache
+import httpx
+import orjson
 import requests
-from flask import current_app
-from typing import Optional, Dict, List, Tuple
-from datetime import datetime
+from cachetools import LRUCache, TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import current_app, has_app_context
+from typing import Optional, Dict, Iterable, List, Tuple
+from app.config import get_settings
 from app.constants import (
     SERPAPI_TRIP_TYPE_ROUND_TRIP,
     SERPAPI_TRIP_TYPE_ONE_WAY,
     DEFAULT_CURRENCY,
     API_TIMEOUT,
+    SERPAPI_MAX_RETRIES,
+    SERPAPI_BACKOFF_MAX,
+    SERPAPI_RETRY_STATUSES,
+    SERPAPI_WEB_MAX_RETRIES,
+    SERPAPI_WEB_BACKOFF_MAX,
 )
 
+logger = logging.getLogger(__name__)
+
 # Mapping of airline names to IATA codes for SerpAPI
 AIRLINE_NAME_TO_IATA = {
     'Delta': 'DL',
@@ -55,44 +74,203 @@ ALLIANCE_CODES = {'STAR_ALLIANCE', 'SKYTEAM', 'ONEWORLD'}
 # IATA code: two uppercase letters or one uppercase letter + one digit
 VALID_AIRLINE_CODE_PATTERN = re.compile(r'^[A-Z]{2}$|^[A-Z][0-9]$')
 
-def convert_airline_names_to_codes(airline_names: List[str]) -> Tuple[List[str], List[str]]:
+# Codes accepted without running the pattern (mapping values are already canonical)
+_KNOWN_CODES = frozenset(AIRLINE_NAME_TO_IATA.values()) | ALLIANCE_CODES
+
+SERPAPI_URL = 'https://serpapi.com/search'
+
+# api_key query parameter in request URLs quoted by requests/httpx exception messages
+_API_KEY_PARAM = re.compile(r'(api_key=)[^&\s\'"()]+')
+
+# Shared stand-in for missing nested objects in responses; never mutated
+_EMPTY = {}
+
+# Search results keyed by their query parameters: results with a flight are kept for
+# 5 minutes, failed or empty searches for 30 seconds so retries don't dogpile SerpAPI
+_result_cache = TTLCache(maxsize=256, ttl=300)
+_empty_result_cache = TTLCache(maxsize=256, ttl=30)
+_result_cache_lock = threading.Lock()
+
+# Parsed itineraries keyed by (SerpAPI departure/booking token, price)
+_parsed_cache = LRUCache(maxsize=1024)
+_parsed_cache_lock = threading.Lock()
+
+# Searches currently running, so concurrent identical searches can wait instead of repeating them
+_in_flight: Dict[Tuple, threading.Event] = {}
+
+def redact_api_key(text: str, api_key: Optional[str] = None) -> str:
+    """
+    Strip the SerpAPI key from an error message before it is logged or stored.
+
+    Connection, timeout and HTTP status errors quote the full request URL,
+    api_key included, and these messages end up in run summaries and the database.
+    """
+    text = _API_KEY_PARAM.sub(r'\1REDACTED', text)
+    return text.replace(api_key, 'REDACTED') if api_key else text
+
+def _search_cache_key(search_params: Dict) -> Tuple:
+    """Cache key for a search; airline order doesn't change the results, so it is normalised"""
+    items = dict(search_params)
+    if items.get('include_airlines'):
+        items['include_airlines'] = ','.join(sorted(items['include_airlines'].split(',')))
+    return tuple(sorted(items.items()))
+
+def _cache_result(cache_key: Tuple, result: Dict) -> Dict:
+    """Store a search result in the cache matching its outcome and return it"""
+    with _result_cache_lock:
+        if result.get('success') and result.get('cheapest_flight'):
+            _result_cache[cache_key] = result
+        else:
+            _empty_result_cache[cache_key] = result
+    return result
+
+class _SerpApiRetry(Retry):
+    """
+    urllib3 Retry tuned for SerpAPI: a 429 is only retried when it carries
+    Retry-After (a bare 429 usually means the account is out of searches, which
+    waiting won't fix), Retry-After waits are capped at backoff_max, and each
+    retry takes a token from the SERPAPI_RPS limiter like any other call.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429 and not has_retry_after:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.backoff_max)
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        limiter = _serpapi_limiter()
+        if limiter is not None:
+            limiter.acquire()
+
+@lru_cache(maxsize=2)
+def _session(patient: bool) -> requests.Session:
+    """
+    Shared HTTP session for SerpAPI calls (built on first use).
+
+    Reusing one pooled session keeps the TCP/TLS connection to serpapi.com
+    alive between searches instead of handshaking on every request.
+    patient sessions (scheduled checks) retry for up to about a minute;
+    the web session retries once with short waits.
+    """
+    session = requests.Session()
+    session.headers.update({'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'})
+    # Searches are idempotent GETs, so rate limits and transient 5xx are retried
+    # with jittered exponential backoff. raise_on_status=False hands the final
+    # failed response back so its SerpAPI error message is kept.
+    retry = _SerpApiRetry(
+        total=SERPAPI_MAX_RETRIES if patient else SERPAPI_WEB_MAX_RETRIES,
+        backoff_factor=1,
+        backoff_max=SERPAPI_BACKOFF_MAX if patient else SERPAPI_WEB_BACKOFF_MAX,
+        backoff_jitter=1 if patient else 0,
+        status_forcelist=SERPAPI_RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,
+    )
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return session
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket shared by the sync and async search paths.
+
+    Callers reserve a slot up front and then sleep until it comes round, so
+    concurrent searches are spaced out at rate per second after an initial burst.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+@lru_cache(maxsize=1)
+def _rate_limiter(rate: float) -> Optional[_TokenBucket]:
+    """Process-wide SerpAPI throttle (SERPAPI_RPS calls per second; 0 disables it)"""
+    if rate <= 0:
+        return None
+    return _TokenBucket(rate, burst=max(1, int(rate)))
+
+def _serpapi_settings() -> Tuple[Optional[str], float]:
+    """
+    SerpAPI key and calls-per-second limit, from the app config or, outside an
+    app context (scheduled scripts), straight from the environment settings
+    """
+    if has_app_context():
+        return current_app.config.get('SERPAPI_KEY'), float(current_app.config.get('SERPAPI_RPS') or 0)
+    settings = get_settings()
+    return settings.serpapi_key, settings.serpapi_rps
+
+def _serpapi_limiter() -> Optional[_TokenBucket]:
+    return _rate_limiter(_serpapi_settings()[1])
+
+def convert_airline_names_to_codes(airline_names: Iterable[str]) -> Tuple[List[str], List[str]]:
     """
-    Convert airline names to valid SerpApi include_airlines codes.
+    Convert airline names (strings, e.g. from the preferred airlines multi-select)
+    to valid SerpApi include_airlines codes.
 
     Returns:
         (valid_codes, invalid_values)
     """
+    if not airline_names:
+        return [], []
+
     codes: List[str] = []
     invalid: List[str] = []
+    seen = set()
 
+    # Single pass: map, validate and deduplicate (preserving order to avoid bloating the query string)
     for name in airline_names:
-        raw = AIRLINE_NAME_TO_IATA.get(name, name)
-        code = raw.strip().upper() if isinstance(raw, str) else ''
-        if not code:
+        # Mapped codes are already normalized; only free-form input needs cleaning
+        code = AIRLINE_NAME_TO_IATA.get(name)
+        if code is None:
+            code = name.strip().upper()
+        if not code or code in seen:
             continue
 
-        if code in ALLIANCE_CODES or VALID_AIRLINE_CODE_PATTERN.match(code):
+        # Known codes skip the regex; anything else must look like an IATA code
+        if code in _KNOWN_CODES or VALID_AIRLINE_CODE_PATTERN.match(code):
+            seen.add(code)
             codes.append(code)
         else:
             # Keep track of values we intentionally skip to avoid sending bad params
             invalid.append(code)
 
-    # Deduplicate while preserving order to avoid bloating the query string
-    seen = set()
-    unique_codes = []
-    for code in codes:
-        if code not in seen:
-            seen.add(code)
-            unique_codes.append(code)
-
-    return unique_codes, invalid
+    return codes, invalid
 
-def search_flights(depart_from: str, arrive_at: str, departure_date: str,
-                   return_date: Optional[str] = None,
-                   preferred_airlines: Optional[List[str]] = None,
-                   stops: int = 0) -> Optional[Dict]:
+def build_search_params(depart_from: str, arrive_at: str, departure_date: str,
+                        return_date: Optional[str] = None,
+                        preferred_airlines: Optional[List[str]] = None,
+                        stops: int = 0) -> Dict:
     """
-    Search for flights using SerpAPI Google Flights API
+    Build the SerpAPI query parameters for a search (without the API key)
+    
+    The result only depends on the saved search fields, so it is computed once
+    when a search request is created/updated and stored on the row.
     
     Args:
         depart_from: Origin airport code (e.g., 'JFK')
@@ -103,19 +281,11 @@ def search_flights(depart_from: str, arrive_at: str, departure_date: str,
         stops: Number of stops preference (0=any, 1=nonstop, 2=1 stop or fewer, 3=2 stops or fewer, default: 0)
     
     Returns:
-        Dictionary containing flight search results, or None if error
+        Dictionary of SerpAPI query parameters
     """
-    api_key = current_app.config.get('SERPAPI_KEY')
-    
-    if not api_key:
-        print("SERPAPI_KEY not configured")
-        return None
-    
-    # Build API request parameters
     # Using minimal required parameters to avoid 400 errors
     params = {
         'engine': 'google_flights',
-        'api_key': api_key,
         'departure_id': depart_from,
         'arrival_id': arrive_at,
         'outbound_date': departure_date,
@@ -138,75 +308,295 @@ def search_flights(depart_from: str, arrive_at: str, departure_date: str,
             params['include_airlines'] = ','.join(airline_codes)
         if invalid_airlines:
             # Log invalid entries for debugging; do not send them to SerpApi
-            print(f"Skipped invalid airline entries for SerpApi include_airlines: {invalid_airlines}")
+            logger.warning("Skipped invalid airline entries for SerpApi include_airlines: %s", invalid_airlines)
     
     # Add stops parameter if provided (0=any, 1=nonstop, 2=1 stop or fewer, 3=2 stops or fewer)
     # Only add if stops is not 0 (default), as 0 means "any number of stops" which is the API default
     if stops and stops > 0:
         params['stops'] = stops
     
+    return params
+
+def search_flights(depart_from: str, arrive_at: str, departure_date: str,
+                   return_date: Optional[str] = None,
+                   preferred_airlines: Optional[List[str]] = None,
+                   stops: int = 0) -> Optional[Dict]:
+    """
+    Search for flights using SerpAPI Google Flights API
+    
+    Args:
+        depart_from: Origin airport code (e.g., 'JFK')
+        arrive_at: Destination airport code (e.g., 'LAX')
+        departure_date: Departure date in YYYY-MM-DD format
+        return_date: Return date in YYYY-MM-DD format (optional)
+        preferred_airlines: List of preferred airline names (optional)
+        stops: Number of stops preference (0=any, 1=nonstop, 2=1 stop or fewer, 3=2 stops or fewer, default: 0)
+    
+    Returns:
+        Dictionary containing flight search results, or None if error
+    """
+    params = build_search_params(depart_from, arrive_at, departure_date,
+                                 return_date, preferred_airlines, stops)
+    return search_flights_with_params(params)
+
+def search_saved_request(search_request: Dict) -> Optional[Dict]:
+    """
+    Search for flights for a saved search request
+    
+    Uses the precomputed SerpAPI parameters stored on the row when available,
+    falling back to building them from the request fields.
+    
+    Args:
+        search_request: Search request row from the database
+    
+    Returns:
+        Dictionary containing flight search results, or None if error
+    """
+    return search_flights_with_params(_saved_request_params(search_request))
+
+def saved_request_search_key(search_request: Dict) -> Tuple:
+    """Key identifying a saved request's search; requests with equal keys get identical results"""
+    return _search_cache_key(_saved_request_params(search_request))
+
+def search_key_digest(search_key: Tuple) -> str:
+    """Stable string form of a search key, for storing results outside the process"""
+    return hashlib.sha1(orjson.dumps(search_key)).hexdigest()
+
+def _saved_request_params(search_request: Dict) -> Dict:
+    """SerpAPI parameters for a saved search request (stored ones if present)"""
+    params = search_request.get('serpapi_params')
+    if not params:
+        params = build_search_params(
+            depart_from=search_request['depart_from'],
+            arrive_at=search_request['arrive_at'],
+            departure_date=search_request['departure_date'],
+            return_date=search_request.get('return_date'),
+            preferred_airlines=search_request.get('preferred_airlines'),
+            stops=search_request.get('stops', 0)
+        )
+    return params
+
+def search_flights_with_params(search_params: Dict) -> Optional[Dict]:
+    """
+    Run a SerpAPI Google Flights search for prebuilt parameters
+    
+    Results with a flight are cached for a few minutes so repeated searches
+    for the same parameters don't hit SerpAPI again; failed or empty searches
+    are cached for 30 seconds. Concurrent identical searches (e.g. several
+    users tracking the same route) share a single SerpAPI call.
+    
+    Args:
+        search_params: Parameters from build_search_params()
+    
+    Returns:
+        Dictionary containing flight search results, or None if error
+    """
+    api_key = _serpapi_settings()[0]
+    
+    if not api_key:
+        logger.error("SERPAPI_KEY not configured")
+        return None
+    
+    cache_key = _search_cache_key(search_params)
+    with _result_cache_lock:
+        cached = _result_cache.get(cache_key) or _empty_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        # Only one thread searches a given key at a time; the rest wait for its result
+        in_flight = _in_flight.get(cache_key)
+        if in_flight is None:
+            _in_flight[cache_key] = threading.Event()
+    
+    if in_flight is not None:
+        # No timeout: the owner always sets the event when it finishes (see finally
+        # below), and its call can legitimately outlast API_TIMEOUT through retries
+        in_flight.wait()
+        with _result_cache_lock:
+            cached = _result_cache.get(cache_key) or _empty_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        # The other search ended without a cacheable result; search ourselves
+        return _fetch_search(cache_key, search_params, api_key)
+    
+    try:
+        return _fetch_search(cache_key, search_params, api_key)
+    finally:
+        with _result_cache_lock:
+            _in_flight.pop(cache_key).set()
+
+def _fetch_search(cache_key: Tuple, search_params: Dict, api_key: str) -> Dict:
+    """Call SerpAPI for one search and cache the outcome"""
+    params = dict(search_params)
+    params['api_key'] = api_key
+    
     try:
         # Make API request
-        response = requests.get('https://serpapi.com/search', params=params, timeout=API_TIMEOUT)
+        limiter = _serpapi_limiter()
+        if limiter is not None:
+            limiter.acquire()
+        # Only scheduled runs (no app context) can afford the long retry budget
+        response = _session(not has_app_context()).get(SERPAPI_URL, params=params, timeout=API_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
-        
-        # Extract cheapest flight from results
-        cheapest_flight = extract_cheapest_flight(data)
-
-        # Attach a shareable search URL if SerpApi provides one
-        search_url = None
-        meta = data.get('search_metadata', {}) if isinstance(data, dict) else {}
-        if isinstance(meta, dict):
-            search_url = meta.get('google_flights_url') or meta.get('serpapi_url')
-        if cheapest_flight is not None and search_url and not cheapest_flight.get('link'):
-            cheapest_flight['link'] = search_url
-        
-        return {
-            'success': True,
-            'cheapest_flight': cheapest_flight,
-            'raw_data': data,
-            'searched_at': datetime.utcnow().isoformat()
-        }
+        # orjson parses the (often large) response straight from the raw bytes
+        return _cache_result(cache_key, _search_result(orjson.loads(response.content)))
     
     except requests.exceptions.HTTPError as e:
-        error_msg = str(e)
-        # Try to get more details from the response
-        if hasattr(e, 'response') and e.response is not None:
-            try:
-                error_detail = e.response.json()
-                print(f"SerpAPI error details: {error_detail}")
-                # Extract error message if available
-                if isinstance(error_detail, dict):
-                    if 'error' in error_detail:
-                        error_msg = error_detail['error']
-                    elif 'message' in error_detail:
-                        error_msg = error_detail['message']
-            except:
-                error_text = e.response.text
-                print(f"SerpAPI error response: {error_text}")
-                if error_text:
-                    error_msg = error_text[:200]  # Limit error message length
-        return {
+        error_msg = _error_message(e.response) if e.response is not None else None
+        return _cache_result(cache_key, {
             'success': False,
-            'error': error_msg,
-            'searched_at': datetime.utcnow().isoformat()
-        }
+            'error': redact_api_key(error_msg or str(e), api_key)
+        })
     except requests.exceptions.RequestException as e:
-        print(f"Error calling SerpAPI: {e}")
+        error_msg = redact_api_key(str(e), api_key)
+        logger.warning("Error calling SerpAPI: %s", error_msg)
+        return _cache_result(cache_key, {
+            'success': False,
+            'error': error_msg
+        })
+    except Exception as e:
+        error_msg = redact_api_key(str(e), api_key)
+        logger.error("Unexpected error in flight search: %s", error_msg)
         return {
             'success': False,
-            'error': str(e),
-            'searched_at': datetime.utcnow().isoformat()
+            'error': error_msg
         }
+
+def make_async_client() -> httpx.AsyncClient:
+    """
+    HTTP/2 client for async_search_saved_request().
+
+    Create one per event loop (e.g. with ``async with make_async_client() as client``);
+    concurrent searches are multiplexed over a shared connection to serpapi.com.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        timeout=API_TIMEOUT,
+    )
+
+async def async_search_saved_request(search_request: Dict, client: httpx.AsyncClient) -> Optional[Dict]:
+    """Async variant of search_saved_request(), sharing its result cache"""
+    api_key = _serpapi_settings()[0]
+    
+    if not api_key:
+        logger.error("SERPAPI_KEY not configured")
+        return None
+    
+    search_params = _saved_request_params(search_request)
+    cache_key = _search_cache_key(search_params)
+    with _result_cache_lock:
+        cached = _result_cache.get(cache_key) or _empty_result_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    params = dict(search_params)
+    params['api_key'] = api_key
+    
+    try:
+        response = await _get_with_retry(client, params)
+        response.raise_for_status()
+        return _cache_result(cache_key, _search_result(orjson.loads(response.content)))
+    except httpx.HTTPStatusError as e:
+        return _cache_result(cache_key, {
+            'success': False,
+            'error': redact_api_key(_error_message(e.response) or str(e), api_key)
+        })
+    except httpx.HTTPError as e:
+        error_msg = redact_api_key(str(e), api_key)
+        logger.warning("Error calling SerpAPI: %s", error_msg)
+        return _cache_result(cache_key, {
+            'success': False,
+            'error': error_msg
+        })
     except Exception as e:
-        print(f"Unexpected error in flight search: {e}")
+        error_msg = redact_api_key(str(e), api_key)
+        logger.error("Unexpected error in flight search: %s", error_msg)
         return {
             'success': False,
-            'error': str(e),
-            'searched_at': datetime.utcnow().isoformat()
+            'error': error_msg
         }
 
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before retry number attempt (0-based), preferring the server's Retry-After"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), SERPAPI_BACKOFF_MAX)
+    return min(2 ** attempt, SERPAPI_BACKOFF_MAX) + random.uniform(0, 1)
+
+async def _get_with_retry(client: httpx.AsyncClient, params: Dict) -> httpx.Response:
+    """GET a SerpAPI search, retrying rate limits, transient 5xx and connection errors"""
+    limiter = _serpapi_limiter()
+    for attempt in range(SERPAPI_MAX_RETRIES + 1):
+        last_try = attempt == SERPAPI_MAX_RETRIES
+        if limiter is not None:
+            await limiter.acquire_async()
+        try:
+            response = await client.get(SERPAPI_URL, params=params)
+        except httpx.TransportError:
+            if last_try:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        if response.status_code not in SERPAPI_RETRY_STATUSES or last_try:
+            return response
+        # As in _SerpApiRetry: a 429 without Retry-After is usually an exhausted quota
+        if response.status_code == 429 and 'Retry-After' not in response.headers:
+            return response
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+def _search_result(data: Dict) -> Dict:
+    """Build the success result for a parsed SerpAPI response"""
+    # Extract cheapest flight from results
+    cheapest_flight = extract_cheapest_flight(data)
+
+    # Attach a shareable search URL if SerpApi provides one
+    search_url = None
+    meta = data.get('search_metadata', {}) if isinstance(data, dict) else {}
+    if isinstance(meta, dict):
+        search_url = meta.get('google_flights_url') or meta.get('serpapi_url')
+    if cheapest_flight is not None and search_url and not cheapest_flight.get('link'):
+        cheapest_flight['link'] = search_url
+    
+    return {
+        'success': True,
+        'cheapest_flight': cheapest_flight
+    }
+
+def _error_message(response) -> Optional[str]:
+    """Pull a readable error out of a failed SerpAPI response (requests or httpx)"""
+    try:
+        error_detail = orjson.loads(response.content)
+        logger.warning("SerpAPI error details: %s", error_detail)
+        # Extract error message if available
+        if isinstance(error_detail, dict):
+            return error_detail.get('error') or error_detail.get('message')
+    except Exception:
+        error_text = response.text
+        logger.warning("SerpAPI error response: %s", error_text)
+        if error_text:
+            return error_text[:200]  # Limit error message length
+    return None
+
+def _cheapest(flights: List[Dict]) -> Optional[Dict]:
+    """Return the lowest-priced flight in one scan (flights without a usable price are skipped)"""
+    best = None
+    best_price = float('inf')
+    for flight in flights:
+        price = flight.get('price')
+        if isinstance(price, dict):
+            price = price.get('total')
+        if price is None:
+            continue
+        try:
+            value = float(price)
+        except (TypeError, ValueError):
+            continue
+        if value < best_price:
+            best_price = value
+            best = flight
+    return best
+
 def extract_cheapest_flight(data: Dict) -> Optional[Dict]:
     """
     Extract the cheapest flight from SerpAPI response
@@ -218,33 +608,30 @@ def extract_cheapest_flight(data: Dict) -> Optional[Dict]:
         Dictionary with cheapest flight details, or None if no flights found
     """
     try:
-        # SerpAPI Google Flights response structure
-        # The response may have different structures, so we'll handle multiple cases
-        
-        # Check for best_flights (common structure)
-        if 'best_flights' in data and len(data['best_flights']) > 0:
-            best_flight = data['best_flights'][0]
-            return parse_flight_data(best_flight)
-        
-        # Check for other_flights
-        if 'other_flights' in data and len(data['other_flights']) > 0:
-            # Sort by price and get cheapest
-            flights = data['other_flights']
-            cheapest = min(flights, key=lambda x: float(x.get('price', {}).get('total', float('inf'))))
-            return parse_flight_data(cheapest)
+        # SerpAPI Google Flights response structure: results may be under
+        # best_flights, other_flights or flights; use the first non-empty list
+        for key in ('best_flights', 'other_flights', 'flights'):
+            flights = data.get(key)
+            if flights:
+                break
+        else:
+            # If no flights found in expected structure, return None
+            logger.info("No flights found in SerpAPI response")
+            return None
         
-        # Check for flights array
-        if 'flights' in data and len(data['flights']) > 0:
-            flights = data['flights']
-            cheapest = min(flights, key=lambda x: float(x.get('price', {}).get('total', float('inf'))))
-            return parse_flight_data(cheapest)
+        # best_flights leads with the top pick; other lists are in Google's
+        # "top flights" order, not by price, so scan them for the cheapest
+        if key == 'best_flights':
+            return parse_flight_data(flights[0])
         
-        # If no flights found in expected structure, return None
-        print("No flights found in SerpAPI response")
-        return None
+        cheapest = _cheapest(flights)
+        if cheapest is None:
+            logger.info("No priced flights found in SerpAPI response")
+            return None
+        return parse_flight_data(cheapest)
     
-    except Exception as e:
-        print(f"Error extracting cheapest flight: {e}")
+    except Exception:
+        logger.exception("Error extracting cheapest flight")
         return None
 
 def parse_flight_data(flight_data: Dict) -> Dict:
@@ -256,7 +643,29 @@ def parse_flight_data(flight_data: Dict) -> Dict:
     
     Returns:
         Dictionary with standardized flight information
+    
+    Itineraries carrying a departure/booking token are memoized, so repeat checks
+    of a route that keeps returning the same flight skip re-parsing it.
     """
+    token = flight_data.get('departure_token') or flight_data.get('booking_token')
+    if not token:
+        return _parse_flight_data(flight_data)
+    
+    # The price is part of the key so a fare change on the same itinerary is re-parsed
+    cache_key = (token, repr(flight_data.get('price')))
+    with _parsed_cache_lock:
+        parsed = _parsed_cache.get(cache_key)
+    if parsed is None:
+        parsed = _parse_flight_data(flight_data)
+        if 'error' in parsed:
+            return parsed
+        with _parsed_cache_lock:
+            _parsed_cache[cache_key] = parsed
+    # Callers may add keys (e.g. link), so hand out a copy
+    return dict(parsed)
+
+def _parse_flight_data(flight_data: Dict) -> Dict:
+    """Uncached parse_flight_data()"""
     try:
         # Extract price
         price_info = flight_data.get('price', {})
@@ -269,24 +678,11 @@ def parse_flight_data(flight_data: Dict) -> Dict:
         elif isinstance(price_info, (int, float)):
             price = float(price_info)
         
-        # Extract flight segments
-        outbound_segments = []
-        return_segments = []
-        
-        # Handle outbound flights
-        if 'flights' in flight_data:
-            outbound_segments = parse_segments(flight_data['flights'])
+        # Extract flight segments; airlines come from the outbound legs
+        outbound_segments, airlines = parse_segments(flight_data.get('flights', []))
         
         # Handle return flights (if round trip)
-        if 'return_flights' in flight_data:
-            return_segments = parse_segments(flight_data['return_flights'])
-        
-        # Extract airline information
-        airlines = []
-        if outbound_segments:
-            for segment in outbound_segments:
-                if segment.get('airline') and segment['airline'] not in airlines:
-                    airlines.append(segment['airline'])
+        return_segments, _ = parse_segments(flight_data.get('return_flights', []))
         
         # Extract duration
         duration = flight_data.get('duration', {})
@@ -307,12 +703,11 @@ def parse_flight_data(flight_data: Dict) -> Dict:
             'return_segments': return_segments,
             'duration': total_duration,
             'stops': stops,
-            'link': flight_data.get('link', ''),
-            'raw_data': flight_data
+            'link': flight_data.get('link', '')
         }
     
     except Exception as e:
-        print(f"Error parsing flight data: {e}")
+        logger.exception("Error parsing flight data")
         return {
             'price': None,
             'currency': DEFAULT_CURRENCY,
@@ -322,11 +717,10 @@ def parse_flight_data(flight_data: Dict) -> Dict:
             'duration': None,
             'stops': 0,
             'link': '',
-            'raw_data': flight_data,
             'error': str(e)
         }
 
-def parse_segments(segments: List[Dict]) -> List[Dict]:
+def parse_segments(segments: List[Dict]) -> Tuple[List[Dict], List[str]]:
     """
     Parse flight segments from SerpAPI response
     
@@ -334,24 +728,32 @@ def parse_segments(segments: List[Dict]) -> List[Dict]:
         segments: List of flight segments
     
     Returns:
-        List of parsed segment dictionaries
+        (parsed segment dictionaries, distinct airlines in order of appearance)
     """
     parsed_segments = []
+    airlines = []
+    seen_airlines = set()
     
-    for segment in segments:
-        try:
-            parsed_segment = {
-                'departure_airport': segment.get('departure_airport', {}).get('id', ''),
-                'departure_time': segment.get('departure_airport', {}).get('time', ''),
-                'arrival_airport': segment.get('arrival_airport', {}).get('id', ''),
-                'arrival_time': segment.get('arrival_airport', {}).get('time', ''),
-                'airline': segment.get('airline', ''),
+    # One try for the whole loop; .get() on a dict can't raise, so only malformed
+    # (non-dict) segments end the scan early
+    try:
+        for segment in segments:
+            dep = segment.get('departure_airport') or _EMPTY
+            arr = segment.get('arrival_airport') or _EMPTY
+            airline = segment.get('airline', '')
+            parsed_segments.append({
+                'departure_airport': dep.get('id', ''),
+                'departure_time': dep.get('time', ''),
+                'arrival_airport': arr.get('id', ''),
+                'arrival_time': arr.get('time', ''),
+                'airline': airline,
                 'flight_number': segment.get('flight_number', ''),
                 'duration': segment.get('duration', None)
-            }
-            parsed_segments.append(parsed_segment)
-        except Exception as e:
-            print(f"Error parsing segment: {e}")
-            continue
+            })
+            if airline and airline not in seen_airlines:
+                seen_airlines.add(airline)
+                airlines.append(airline)
+    except Exception:
+        logger.exception("Error parsing segment")
     
-    return parsed_segments
+    return parsed_segments, airlines
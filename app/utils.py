@@ -2,25 +2,42 @@
 Utility functions and helpers for the application
 """
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import date
 from flask import flash
+from markupsafe import Markup, escape
+from app.constants import FLASH_DANGER
 
 
 def format_flash_errors(form_errors: Dict, form=None) -> None:
     """
     Format and flash form validation errors
     
+    All errors are joined into a single flash message so the session is
+    only written once, however many fields failed.
+    
     Args:
         form_errors: Dictionary of form field errors from WTForms
         form: Optional form instance to get field labels
     """
+    messages = []
     for field, errors in form_errors.items():
+        if form and hasattr(form, field):
+            field_label = getattr(form, field).label.text
+        else:
+            field_label = field
         for error in errors:
-            if form and hasattr(form, field):
-                field_label = getattr(form, field).label.text
-                flash(f'{field_label}: {error}', 'danger')
-            else:
-                flash(f'{field}: {error}', 'danger')
+            messages.append(f'{field_label}: {error}')
+    
+    if messages:
+        flash(Markup('<br>').join(escape(message) for message in messages), FLASH_DANGER)
+
+def _strip_str(value: Any) -> Any:
+    """Strip surrounding whitespace from strings, pass anything else through"""
+    return value.strip() if isinstance(value, str) else value
+
+def _iso(value: Any) -> Any:
+    """ISO-format dates, pass anything else through"""
+    return value.isoformat() if hasattr(value, 'isoformat') else value
 
 def prepare_search_request_data(form_data: Dict) -> Dict[str, Any]:
     """
@@ -32,18 +49,18 @@ def prepare_search_request_data(form_data: Dict) -> Dict[str, Any]:
     Returns:
         Dictionary with prepared search request data
     """
-    return_date = None
-    if form_data.get('trip_type') == 'round_trip' and form_data.get('return_date'):
-        return_date = form_data['return_date'].isoformat() if hasattr(form_data['return_date'], 'isoformat') else form_data['return_date']
+    get = form_data.get
+    trip_type = get('trip_type')
+    return_date = get('return_date')
     
     return {
-        'depart_from': form_data['depart_from'].strip() if isinstance(form_data.get('depart_from'), str) else form_data.get('depart_from'),
-        'arrive_at': form_data['arrive_at'].strip() if isinstance(form_data.get('arrive_at'), str) else form_data.get('arrive_at'),
-        'departure_date': form_data['departure_date'].isoformat() if hasattr(form_data.get('departure_date'), 'isoformat') else form_data.get('departure_date'),
-        'return_date': return_date,
-        'trip_type': form_data.get('trip_type'),
-        'preferred_airlines': form_data.get('preferred_airlines') if form_data.get('preferred_airlines') else None,
-        'stops': form_data.get('stops', 0)
+        'depart_from': _strip_str(get('depart_from')),
+        'arrive_at': _strip_str(get('arrive_at')),
+        'departure_date': _iso(get('departure_date')),
+        'return_date': _iso(return_date) if trip_type == 'round_trip' and return_date else None,
+        'trip_type': trip_type,
+        'preferred_airlines': get('preferred_airlines') or None,
+        'stops': get('stops', 0)
     }
 
 def populate_form_from_search_request(form, search_request: Dict) -> None:
@@ -56,9 +73,9 @@ def populate_form_from_search_request(form, search_request: Dict) -> None:
     """
     form.depart_from.data = search_request.get('depart_from')
     form.arrive_at.data = search_request.get('arrive_at')
-    form.departure_date.data = datetime.fromisoformat(search_request['departure_date']).date()
+    form.departure_date.data = date.fromisoformat(search_request['departure_date'][:10])
     if search_request.get('return_date'):
-        form.return_date.data = datetime.fromisoformat(search_request['return_date']).date()
+        form.return_date.data = date.fromisoformat(search_request['return_date'][:10])
     form.trip_type.data = search_request.get('trip_type')
     form.stops.data = search_request.get('stops', 0)
     if search_request.get('preferred_airlines'):
@@ -79,10 +96,14 @@ def get_cheapest_price_from_flight(flight_data: Optional[Dict]) -> Optional[floa
     
     price_info = flight_data.get('price')
     if isinstance(price_info, dict):
-        return float(price_info.get('total', 0)) if price_info.get('total') else None
-    elif isinstance(price_info, (int, float)):
+        total = price_info.get('total')
+        return float(total) if total else None
+    if isinstance(price_info, (int, float)):
         return float(price_info)
-    return None
+    try:
+        return float(price_info)
+    except (TypeError, ValueError):
+        return None
 
 
 def should_send_price_alert(
@@ -7,226 +7,472 @@ Usage:
     python scripts/check_flights.py
 """
 
+import asyncio
+import json
+import logging
 import sys
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
 from datetime import datetime
+from html import escape
+from string import Template
 
-# Add parent directory to path to import app modules
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add parent directory to path to import app modules, unless app is already
+# importable (installed, or run from the project root with python -m)
+try:
+    import app  # noqa: F401
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import create_app
+from dotenv import load_dotenv
+
+from app.constants import CRON_REQUEST_COLUMNS
 from app.database import (
     get_all_active_search_requests,
-    update_price_tracking_with_result,
-    get_price_tracking,
-    get_user_by_id,
-    mark_price_notified,
+    get_cached_search_results,
+    store_search_results,
+    bulk_update_price_tracking,
+    get_price_tracking_bulk,
+    get_users_by_ids,
+    mark_price_notified_bulk,
+    record_flight_check_errors,
+)
+from app.serpapi_service import (
+    async_search_saved_request,
+    make_async_client,
+    redact_api_key,
+    saved_request_search_key,
+    search_key_digest,
+    search_saved_request,
 )
-from app.serpapi_service import search_flights
-from app.utils import get_cheapest_price_from_flight, should_send_price_alert
-from app.email_service import send_price_drop_email
+from app.utils import should_send_price_alert
+from app.email_service import send_price_drop_email_bulk, flush_email_queue
+
+log = logging.getLogger(__name__)
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that leaves writes in the stream's buffer instead of flushing
+    after every record; output is flushed by flush_log() and at interpreter exit.
+    """
+    
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+def flush_log():
+    """Write out buffered log lines (called between phases of the run)"""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+# Price-drop email body, parsed once; values are HTML-escaped by render_alert_email()
+ALERT_EMAIL_TEMPLATE = Template("""
+<html>
+    <body>
+        <p>Good news!</p>
+        <p>We found a cheaper flight for your tracked route
+        $depart_from → $arrive_at on $departure_date.</p>
+        <p>
+            Latest price: <strong>$$$latest_price $currency</strong><br/>
+            Previous best: <strong>$$$baseline $currency</strong>
+        </p>
+        $link_block
+        <p>Prices can change at any time, so if this works for you, consider booking soon.</p>
+    </body>
+</html>
+""")
+
+# Two-decimal price formatting; the format spec is parsed once
+_fmt_price = "{:.2f}".format
+
+def _fmt_opt(price):
+    """$-prefixed price for log lines, or "None" when missing"""
+    return "$" + _fmt_price(price) if price is not None else "None"
+
+def render_alert_email(depart_from, arrive_at, departure_date, latest_price, baseline, currency, flight_link):
+    """Render the price-drop email body"""
+    link_block = f'<p><a href="{escape(flight_link)}">Book this flight</a></p>' if flight_link else ''
+    return ALERT_EMAIL_TEMPLATE.substitute(
+        depart_from=escape(str(depart_from)),
+        arrive_at=escape(str(arrive_at)),
+        departure_date=escape(str(departure_date)),
+        latest_price=_fmt_price(latest_price),
+        baseline=_fmt_price(baseline),
+        currency=escape(str(currency)),
+        link_block=link_block,
+    )
+
+def record_notifications(notified):
+    """Mark alerted prices as notified, in one round-trip, once their emails have gone out"""
+    if not notified:
+        return
+    updated = {row['search_request_id'] for row in mark_price_notified_bulk(notified)}
+    for request_id, latest_price in notified:
+        if request_id in updated:
+            log.info("  ✓ Price alert notification recorded for %s (last_notified_price=$%.2f)", request_id, latest_price)
+        else:
+            log.warning("  ✗ Failed to update last_notified_price in database for %s", request_id)
+
+def process_price_alert(request, tracking, old_tracking, user, currency, outbox):
+    """
+    Send a price-drop alert for a search request if its latest price beats the
+    previous baseline. Uses OLD minimum_price for comparison (before it was
+    updated to the new lower price). Alerts are collected in outbox, keyed by
+    (subject, html_body), and sent by dispatch_alerts().
+    """
+    request_id = request['id']
+    depart_from = request['depart_from']
+    arrive_at = request['arrive_at']
+    departure_date = request['departure_date']
+    old_minimum_price = old_tracking.get('minimum_price') if old_tracking else None
+    old_last_notified_price = old_tracking.get('last_notified_price') if old_tracking else None
+    
+    log.debug("Alert check: %s -> %s on %s", depart_from, arrive_at, departure_date)
+    try:
+        if tracking and user:
+            latest_price = tracking.get('latest_price')
+            # Use old_minimum_price for comparison, not the newly updated one
+            minimum_price = old_minimum_price
+            last_notified_price = old_last_notified_price
+
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("  → Price alert check: latest=%s, old_minimum=%s, last_notified=%s",
+                          _fmt_opt(latest_price), _fmt_opt(minimum_price), _fmt_opt(last_notified_price))
+
+            if should_send_price_alert(latest_price, minimum_price, last_notified_price):
+                log.debug("  ✓ Price alert should be sent!")
+                to_email = user.get('email')
+                if to_email:
+                    flight_link = tracking.get('flight_link')
+                    baseline = last_notified_price if last_notified_price is not None else minimum_price
+                    subject = "Cheaper flight found for your tracked route"
+                    html_body = render_alert_email(
+                        depart_from, arrive_at, departure_date,
+                        latest_price, baseline, currency, flight_link,
+                    )
+
+                    # Identical alerts (same route and prices) go out as one message
+                    outbox.setdefault((subject, html_body), []).append((to_email, request_id, latest_price))
+                    log.debug("  → Price alert for %s added to outbox", to_email)
+                else:
+                    log.info("  ✗ Skipping alert for %s: user has no email on file.", request_id)
+            else:
+                # Log why alert wasn't sent for debugging
+                if latest_price is None:
+                    log.debug("  → No alert: latest_price is None")
+                elif minimum_price is None and last_notified_price is None:
+                    log.debug("  → No alert: No baseline price available (minimum_price=%s, last_notified_price=%s)", minimum_price, last_notified_price)
+                else:
+                    baseline = last_notified_price if last_notified_price is not None else minimum_price
+                    if latest_price >= baseline:
+                        log.debug("  → No alert: Latest price $%.2f is not lower than baseline $%.2f", latest_price, baseline)
+    except Exception as alert_error:
+        log.warning("  Error while processing price-drop alert logic for %s: %s", request_id, alert_error)
+
+def dispatch_alerts(outbox, dry_run, notified):
+    """
+    Send each distinct alert once to all of its recipients. As emails go out,
+    the (request_id, latest_price) pairs of every accepted address are appended
+    to notified.
+    """
+    for (subject, html_body), recipients in outbox.items():
+        # A user tracking the same search more than once gets a single copy
+        to_emails = list(dict.fromkeys(to_email for to_email, _, _ in recipients))
+        
+        def on_sent(accepted, recipients=recipients):
+            accepted = set(accepted)
+            notified.extend(
+                (request_id, latest_price)
+                for to_email, request_id, latest_price in recipients
+                if to_email in accepted
+            )
+        
+        log.info("  → Queueing price alert email to %s (dry_run=%s)", ', '.join(to_emails), dry_run)
+        email_queued = send_price_drop_email_bulk(
+            to_emails=to_emails,
+            subject=subject,
+            html_body=html_body,
+            dry_run=dry_run,
+            on_sent=on_sent,
+        )
+        
+        if dry_run:
+            for to_email, _, latest_price in recipients:
+                log.info("  → DRY RUN: Would mark last_notified_price=$%.2f for %s (email not actually sent)", latest_price, to_email)
+        elif not email_queued:
+            log.warning("  ✗ Failed to queue price alert email to %s - last_notified_price NOT updated", ', '.join(to_emails))
+
+def evaluate_search(request, label, search_result):
+    """
+    Turn one request's search result into (error, tracking_update, currency);
+    error is None on success, otherwise the other two are None.
+    """
+    request_id = request['id']
+    route = f"{request['depart_from']} -> {request['arrive_at']}"
+    
+    def failure(error_msg, marker):
+        log.info("%s %s on %s: ✗ %s: %s", label, route, request['departure_date'], marker, error_msg)
+        return {'request_id': request_id, 'route': route, 'error': error_msg}, None, None
+    
+    if isinstance(search_result, Exception):
+        return failure(f"Exception: {redact_api_key(str(search_result))}", 'Error')
+    
+    if not (search_result and search_result.get('success')):
+        error_msg = search_result.get('error', 'Unknown error') if search_result else 'No response from API'
+        return failure(error_msg, 'Failed')
+    
+    # The cheapest flight was picked in one pass while parsing the response, and
+    # parse_flight_data() already normalised its price to a float (or None)
+    cheapest_flight = search_result.get('cheapest_flight')
+    price = cheapest_flight.get('price') if cheapest_flight else None
+    if not price:
+        return failure("Flight search completed but no price found", 'Warning')
+    
+    currency = cheapest_flight.get('currency', 'USD')
+    log.info("%s %s on %s: ✓ Found cheapest flight at $%.2f %s", label, route, request['departure_date'], price, currency)
+    update = {
+        'search_request_id': request_id,
+        'price': price,
+        'currency': currency,
+        'airlines': cheapest_flight.get('airlines', []),
+        'flight_details': cheapest_flight,
+        'flight_link': cheapest_flight.get('link')
+    }
+    return None, update, currency
+
+def group_requests(active_requests):
+    """
+    Group requests that would run the same SerpAPI search (same route, dates,
+    airlines and stops), so each unique search is made once per run.
+    
+    Returns {search_key: [(position, request), ...]}, positions numbered from 1.
+    """
+    groups = defaultdict(list)
+    for idx, request in enumerate(active_requests, 1):
+        groups[saved_request_search_key(request)].append((idx, request))
+    return groups
+
+def evaluate_group(group, total, search_result):
+    """Evaluate one search result for every request that shares it"""
+    return [
+        (request, evaluate_search(request, f"[{idx}/{total}]", search_result))
+        for idx, request in group
+    ]
+
+def process_one(request):
+    """Search flights for one active request (runs on a worker thread)"""
+    try:
+        return search_saved_request(request)
+    except Exception as e:
+        return e
+
+def search_all_threaded(groups):
+    """Run each unique search on a thread pool; yields (search_key, result) as they finish"""
+    # SerpAPI calls are network-bound, so overlap them; the SerpAPI session's
+    # connection pool (16) covers the default worker count
+    max_workers = int(os.getenv('FLIGHT_CHECK_CONCURRENCY', '8'))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures_to_key = {
+            executor.submit(process_one, group[0][1]): key
+            for key, group in groups.items()
+        }
+        for future in as_completed(futures_to_key):
+            yield futures_to_key[future], future.result()
+
+async def search_all_async(groups):
+    """Run each unique search on one event loop over a shared HTTP/2 client"""
+    limit = asyncio.Semaphore(int(os.getenv('FLIGHT_CHECK_CONCURRENCY', '20')))
+    keys = list(groups)
+    
+    async with make_async_client() as client:
+        async def search_one(request):
+            async with limit:
+                return await async_search_saved_request(request, client)
+        
+        # Exceptions come back in place of results and are reported by evaluate_search()
+        search_results = await asyncio.gather(
+            *(search_one(groups[key][0][1]) for key in keys),
+            return_exceptions=True,
+        )
+    
+    return list(zip(keys, search_results))
+
+def load_cached_results(groups):
+    """
+    Results stored by recent runs (within SERPAPI_CACHE_TTL_MINUTES, default 15)
+    for the given searches, as {search_key: result}.
+    """
+    ttl_minutes = int(os.getenv('SERPAPI_CACHE_TTL_MINUTES', '15'))
+    if ttl_minutes <= 0:
+        return {}
+    keys_by_digest = {search_key_digest(key): key for key in groups}
+    cached = get_cached_search_results(keys_by_digest, ttl_minutes * 60)
+    return {keys_by_digest[digest]: result for digest, result in cached.items()}
 
 def check_all_flights():
     """
     Check flight prices for all active search requests.
+    Searches run concurrently (FLIGHT_CHECK_CONCURRENCY workers, default 8), or
+    on an asyncio event loop when FLIGHT_CHECK_ASYNC=1 (default concurrency 20).
     Returns tuple: (success_count, failure_count, errors)
     """
-    app = create_app()
+    # Read once per run rather than per alert
+    dry_run_env = os.getenv("PRICE_ALERT_DRY_RUN", "false")
+    dry_run = dry_run_env.lower().strip() in ("1", "true", "yes")
+    log.info("PRICE_ALERT_DRY_RUN env var: '%s' → dry_run=%s", dry_run_env, dry_run)
     
     success_count = 0
     failure_count = 0
     errors = []
+    pending_updates = []
+    pending_alerts = []
     
-    with app.app_context():
-        # Get all active search requests (future departure dates)
-        print(f"[{datetime.now().isoformat()}] Fetching active search requests...")
-        active_requests = get_all_active_search_requests()
-        
-        if not active_requests:
-            print("No active search requests found.")
-            return 0, 0, []
-        
-        print(f"Found {len(active_requests)} active search request(s).")
-        print("-" * 80)
-        
-        # Process each request
-        for idx, request in enumerate(active_requests, 1):
-            request_id = request['id']
-            depart_from = request['depart_from']
-            arrive_at = request['arrive_at']
-            departure_date = request['departure_date']
-            
-            print(f"\n[{idx}/{len(active_requests)}] Checking: {depart_from} -> {arrive_at} on {departure_date}")
-            
-            try:
-                # Perform flight search
-                search_result = search_flights(
-                    depart_from=depart_from,
-                    arrive_at=arrive_at,
-                    departure_date=departure_date,
-                    return_date=request.get('return_date'),
-                    preferred_airlines=request.get('preferred_airlines'),
-                    stops=request.get('stops', 0)
-                )
-                
-                if search_result and search_result.get('success'):
-                    cheapest_flight = search_result.get('cheapest_flight')
-                    price = get_cheapest_price_from_flight(cheapest_flight)
-                    
-                    if price:
-                        # Get OLD tracking data BEFORE updating (to compare against previous minimum)
-                        old_tracking = get_price_tracking(request_id)
-                        old_minimum_price = old_tracking.get('minimum_price') if old_tracking else None
-                        old_last_notified_price = old_tracking.get('last_notified_price') if old_tracking else None
-                        
-                        # Update price tracking with search result
-                        update_price_tracking_with_result(
-                            search_request_id=request_id,
-                            price=price,
-                            currency=cheapest_flight.get('currency', 'USD'),
-                            airlines=cheapest_flight.get('airlines', []),
-                            flight_details=cheapest_flight,
-                            flight_link=cheapest_flight.get('link')
-                        )
-                        
-                        currency = cheapest_flight.get('currency', 'USD')
-                        print(f"  ✓ Success: Found cheapest flight at ${price:.2f} {currency}")
-                        success_count += 1
-
-                        # After updating tracking, decide if we should send a price-drop alert
-                        # Use OLD minimum_price for comparison (before it was updated to the new lower price)
-                        try:
-                            tracking = get_price_tracking(request_id)
-                            user = get_user_by_id(request.get('user_id')) if request.get('user_id') else None
-
-                            if tracking and user:
-                                latest_price = tracking.get('latest_price')
-                                # Use old_minimum_price for comparison, not the newly updated one
-                                minimum_price = old_minimum_price
-                                last_notified_price = old_last_notified_price
-
-                                # Debug logging
-                                old_min_str = f"${minimum_price:.2f}" if minimum_price is not None else "None"
-                                last_notified_str = f"${last_notified_price:.2f}" if last_notified_price is not None else "None"
-                                print(f"  → Price alert check: latest=${latest_price:.2f}, old_minimum={old_min_str}, last_notified={last_notified_str}")
-
-                                if should_send_price_alert(latest_price, minimum_price, last_notified_price):
-                                    print(f"  ✓ Price alert should be sent!")
-                                    to_email = user.get('email')
-                                    if to_email:
-                                        dry_run_env = os.getenv("PRICE_ALERT_DRY_RUN", "false")
-                                        dry_run = dry_run_env.lower().strip() in (
-                                            "1",
-                                            "true",
-                                            "yes",
-                                        )
-                                        print(f"  → PRICE_ALERT_DRY_RUN env var: '{dry_run_env}' → dry_run={dry_run}")
-
-                                        flight_link = tracking.get('flight_link')
-                                        baseline = last_notified_price if last_notified_price is not None else minimum_price
-                                        subject = "Cheaper flight found for your tracked route"
-                                        html_body = f"""
-                                        <html>
-                                            <body>
-                                                <p>Good news!</p>
-                                                <p>We found a cheaper flight for your tracked route
-                                                {depart_from} → {arrive_at} on {departure_date}.</p>
-                                                <p>
-                                                    Latest price: <strong>${float(latest_price):.2f} {currency}</strong><br/>
-                                                    Previous best: <strong>${float(baseline):.2f} {currency}</strong>
-                                                </p>
-                                                {'<p><a href="' + flight_link + '">Book this flight</a></p>' if flight_link else ''}
-                                                <p>Prices can change at any time, so if this works for you, consider booking soon.</p>
-                                            </body>
-                                        </html>
-                                        """
-
-                                        print(f"  → Sending price alert email to {to_email} (dry_run={dry_run})")
-                                        email_sent = send_price_drop_email(
-                                            to_email=to_email,
-                                            subject=subject,
-                                            html_body=html_body,
-                                            dry_run=dry_run,
-                                        )
-
-                                        if email_sent and not dry_run:
-                                            result = mark_price_notified(request_id, latest_price)
-                                            if result:
-                                                print(f"  ✓ Price alert notification recorded in database (last_notified_price=${latest_price:.2f})")
-                                            else:
-                                                print(f"  ✗ WARNING: Failed to update last_notified_price in database")
-                                        elif dry_run:
-                                            print(f"  → DRY RUN: Would mark last_notified_price=${latest_price:.2f} (email not actually sent)")
-                                        elif not email_sent:
-                                            print(f"  ✗ WARNING: Failed to send price alert email to {to_email} - last_notified_price NOT updated")
-                                    else:
-                                        print("  ✗ Skipping alert: user has no email on file.")
-                                else:
-                                    # Log why alert wasn't sent for debugging
-                                    if latest_price is None:
-                                        print(f"  → No alert: latest_price is None")
-                                    elif minimum_price is None and last_notified_price is None:
-                                        print(f"  → No alert: No baseline price available (minimum_price={minimum_price}, last_notified_price={last_notified_price})")
-                                    else:
-                                        baseline = last_notified_price if last_notified_price is not None else minimum_price
-                                        if latest_price >= baseline:
-                                            print(f"  → No alert: Latest price ${latest_price:.2f} is not lower than baseline ${baseline:.2f}")
-                        except Exception as alert_error:
-                            print(f"  Warning: error while processing price-drop alert logic: {alert_error}")
-                    else:
-                        error_msg = "Flight search completed but no price found"
-                        print(f"  ✗ Warning: {error_msg}")
-                        errors.append({
-                            'request_id': request_id,
-                            'route': f"{depart_from} -> {arrive_at}",
-                            'error': error_msg
-                        })
-                        failure_count += 1
-                else:
-                    error_msg = search_result.get('error', 'Unknown error') if search_result else 'No response from API'
-                    print(f"  ✗ Failed: {error_msg}")
-                    errors.append({
-                        'request_id': request_id,
-                        'route': f"{depart_from} -> {arrive_at}",
-                        'error': error_msg
-                    })
-                    failure_count += 1
-                    
-            except Exception as e:
-                error_msg = f"Exception: {str(e)}"
-                print(f"  ✗ Error: {error_msg}")
-                errors.append({
-                    'request_id': request_id,
-                    'route': f"{depart_from} -> {arrive_at}",
-                    'error': error_msg
-                })
+    # Get all active search requests (future departure dates)
+    log.info("Fetching active search requests...")
+    active_requests = get_all_active_search_requests(CRON_REQUEST_COLUMNS)
+    
+    if not active_requests:
+        log.info("No active search requests found.")
+        return 0, 0, []
+    
+    total = len(active_requests)
+    groups = group_requests(active_requests)
+    log.info("Found %d active search request(s) (%d unique searches).", total, len(groups))
+    log.info("-" * 80)
+    
+    # Get OLD tracking data BEFORE updating (to compare against previous minimum), in one batch
+    old_tracking_by_id = {
+        row['search_request_id']: row
+        for row in get_price_tracking_bulk(request['id'] for request in active_requests)
+    }
+    
+    # Searches made recently by another run are reused rather than paid for again
+    cached_results = load_cached_results(groups)
+    if cached_results:
+        log.info("Reusing %d recent search result(s).", len(cached_results))
+    to_search = {key: group for key, group in groups.items() if key not in cached_results}
+    
+    if not to_search:
+        search_results = []
+    elif os.getenv('FLIGHT_CHECK_ASYNC', '').strip() == '1':
+        search_results = asyncio.run(search_all_async(to_search))
+    else:
+        search_results = search_all_threaded(to_search)
+    
+    fresh_results = {}
+    for key, search_result in chain(cached_results.items(), search_results):
+        if key not in cached_results and isinstance(search_result, dict) and search_result.get('cheapest_flight'):
+            fresh_results[search_key_digest(key)] = search_result
+        for request, (error, update, currency) in evaluate_group(groups[key], total, search_result):
+            if error:
+                errors.append(error)
                 failure_count += 1
+            else:
+                pending_updates.append(update)
+                pending_alerts.append((request, currency))
+                success_count += 1
+    flush_log()
+    
+    store_search_results(fresh_results)
+    # Keep a durable record of this run's failures (one batched insert)
+    record_flight_check_errors(errors)
+    
+    # Store every search result in a single round-trip, then run alert checks
+    # against the freshly updated tracking rows
+    if pending_updates:
+        log.info("Saving %d price tracking update(s)...", len(pending_updates))
+        updated = {row['search_request_id']: row for row in bulk_update_price_tracking(pending_updates)}
+        users_by_id = {
+            user['id']: user
+            for user in get_users_by_ids({request['user_id'] for request, _ in pending_alerts if request.get('user_id')})
+        }
+        outbox = {}
+        for request, currency in pending_alerts:
+            process_price_alert(
+                request,
+                updated.get(request['id']),
+                old_tracking_by_id.get(request['id']),
+                users_by_id.get(request.get('user_id')),
+                currency,
+                outbox,
+            )
+        notified = []
+        if outbox:
+            dispatch_alerts(outbox, dry_run, notified)
+        
+        # Wait for queued alert emails before recording what was sent
+        flush_email_queue()
+        record_notifications(notified)
+        flush_log()
     
     return success_count, failure_count, errors
 
+def write_run_summary(success_count, failure_count, errors):
+    """
+    Write the run's counts and errors as JSON for later CI steps: to
+    FLIGHT_CHECK_SUMMARY_PATH when set, and on GitHub Actions also as step
+    outputs (GITHUB_OUTPUT) and in the job summary (GITHUB_STEP_SUMMARY).
+    """
+    summary = json.dumps(
+        {'success': success_count, 'failure': failure_count, 'errors': errors},
+        indent=2,
+        default=str,
+    )
+    
+    summary_path = os.getenv('FLIGHT_CHECK_SUMMARY_PATH')
+    if summary_path:
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(summary + "\n")
+    
+    github_output = os.getenv('GITHUB_OUTPUT')
+    if github_output:
+        with open(github_output, 'a', encoding='utf-8') as f:
+            f.write(f"success_count={success_count}\nfailure_count={failure_count}\n")
+    
+    step_summary = os.getenv('GITHUB_STEP_SUMMARY')
+    if step_summary:
+        with open(step_summary, 'a', encoding='utf-8') as f:
+            f.write(f"### Flight price check\n\n```json\n{summary}\n```\n")
+
 def main():
     """Main entry point for the script"""
-    print("=" * 80)
-    print("Flight Price Check Automation")
-    print(f"Started at: {datetime.now().isoformat()}")
-    print("=" * 80)
+    # No Flask app is built here, so load .env the way create_app() would
+    load_dotenv()
+    
+    handler = BufferedStreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(
+        level=os.getenv('FLIGHT_CHECK_LOG_LEVEL', 'INFO').upper(),
+        handlers=[handler],
+    )
+    
+    log.info("=" * 80)
+    log.info("Flight Price Check Automation")
+    log.info("Started at: %s", datetime.now().isoformat())
+    log.info("=" * 80)
     
     try:
         success_count, failure_count, errors = check_all_flights()
         
-        print("\n" + "=" * 80)
-        print("Summary")
-        print("=" * 80)
-        print(f"Successful checks: {success_count}")
-        print(f"Failed checks: {failure_count}")
+        log.info("=" * 80)
+        log.info("Summary")
+        log.info("=" * 80)
+        log.info("Successful checks: %d", success_count)
+        log.info("Failed checks: %d", failure_count)
         
         if errors:
-            print("\nErrors encountered:")
+            log.info("Errors encountered:")
             for error in errors:
-                print(f"  - {error['route']}: {error['error']}")
+                log.info("  - %s: %s", error['route'], error['error'])
+        
+        log.info("Completed at: %s", datetime.now().isoformat())
+        log.info("=" * 80)
         
-        print(f"\nCompleted at: {datetime.now().isoformat()}")
-        print("=" * 80)
+        write_run_summary(success_count, failure_count, errors)
         
         # Exit with non-zero code if there were failures
         # This helps GitHub Actions detect issues
@@ -236,9 +482,7 @@ def main():
             sys.exit(0)
             
     except Exception as e:
-        print(f"\nFatal error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Fatal error: %s", e)
         sys.exit(1)
 
 if __name__ == '__main__':